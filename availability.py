@@ -0,0 +1,243 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+from flask import current_app
+
+from models import Room, Reservation
+
+logger = logging.getLogger(__name__)
+
+# How long (in seconds) an index may be served before it is reloaded from the
+# database. Bookings made by other worker processes only become visible after
+# a reload, so keep this short; reloads run on a background thread.
+DEFAULT_MAX_AGE = 60
+
+
+def to_night(value):
+    """
+    Convert a date, datetime or "YYYY-MM-DD" string into a day ordinal.
+    """
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d")
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.toordinal()
+    return int(value)
+
+
+class AvailabilityIndex:
+    """
+    In-memory interval index of booked nights, one sorted run per room.
+
+    Every room keeps its reservations as half-open [check_in, check_out)
+    intervals of day ordinals. Overlapping reservations are merged into
+    disjoint busy ranges so a "is this room free" question is a single
+    binary search, independent of how many reservations exist overall.
+
+    All merged ranges are also kept in one list sorted by start. A "which
+    rooms are free" query bisects that list to find the ranges that can
+    overlap the stay (those starting less than the longest range before
+    check-out), then takes the bookable rooms minus the busy ones. Only
+    the set difference still grows with the number of rooms.
+
+    Only stays that check out after ``since`` (today by default) are
+    loaded; the index answers nothing about the past.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._room_ids = set()       # bookable rooms (Room.availability is True)
+        self._reservations = {}      # room_id -> sorted [(start, end, reservation_id)]
+        self._starts = {}            # room_id -> merged busy range starts
+        self._ends = {}              # room_id -> merged busy range ends
+        self._busy = []              # every room's merged ranges as sorted (start, end, room_id)
+        self._max_span = 0           # nights in the longest merged range
+        self._loaded_at = None
+        self._load_lock = threading.Lock()
+        self._reloading = False
+        self._changes = None         # add/remove calls made while a reload runs, replayed after it
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self, room_ids, reservations):
+        """
+        Rebuild the index from bookable room ids and
+        (room_id, check_in, check_out, reservation_id) tuples.
+        """
+        by_room = {}
+        for room_id, check_in, check_out, reservation_id in reservations:
+            by_room.setdefault(room_id, []).append((to_night(check_in), to_night(check_out), reservation_id))
+
+        starts, ends, busy = {}, {}, []
+        for room_id, intervals in by_room.items():
+            intervals.sort()
+            starts[room_id], ends[room_id] = _merge(intervals)
+            busy.extend(zip(starts[room_id], ends[room_id], [room_id] * len(starts[room_id])))
+        busy.sort()
+
+        with self._lock:
+            self._room_ids = set(room_ids)
+            self._reservations = by_room
+            self._starts = starts
+            self._ends = ends
+            self._busy = busy
+            self._max_span = max((end - start for start, end, _ in busy), default=0)
+            self._loaded_at = time.monotonic()
+
+    def load_from_db(self, since=None):
+        """
+        Rebuild the index from the Room and Reservation tables, skipping
+        stays that check out on or before ``since`` (default today).
+        Must be called inside an application context.
+        """
+        since = since or date.today()
+        room_ids = [row.id for row in Room.query.with_entities(Room.id).filter(Room.availability == True)]
+        reservations = Reservation.query.with_entities(
+            Reservation.room_id, Reservation.check_in_date, Reservation.check_out_date, Reservation.id
+        ).filter(Reservation.status != "cancelled",
+                 Reservation.check_out_date > datetime.combine(since, datetime.min.time()))
+        self.load(room_ids, reservations)
+
+    def ensure_fresh(self):
+        """
+        Load the index on first use. Once it is older than max_age, keep
+        serving it and reload it on a background thread.
+        """
+        if self._loaded_at is None:
+            with self._load_lock:
+                if self._loaded_at is None:
+                    self.load_from_db()
+            return
+        if self.max_age is not None and time.monotonic() - self._loaded_at > self.max_age:
+            self._reload_in_background()
+
+    def _reload_in_background(self):
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+            self._changes = []
+        threading.Thread(target=self._reload, args=(current_app._get_current_object(),),
+                         name="availability-reload", daemon=True).start()
+
+    def _reload(self, app):
+        try:
+            with app.app_context():
+                with self._load_lock:
+                    self.load_from_db()
+        except Exception as e:
+            logger.warning("Availability index reload failed, retrying after max_age: %s", e)
+            self._loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                # Bookings committed while the reload ran may be missing from what it read
+                changes, self._changes, self._reloading = self._changes, None, False
+                for change, args in changes or ():
+                    change(*args)
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def add(self, room_id, check_in, check_out, reservation_id=None):
+        """
+        Record a committed reservation.
+        """
+        interval = (to_night(check_in), to_night(check_out), reservation_id)
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((self.add, (room_id, check_in, check_out, reservation_id)))
+            intervals = self._reservations.setdefault(room_id, [])
+            if interval not in intervals:
+                insort(intervals, interval, key=lambda item: (item[0], item[1]))
+            self._set_ranges(room_id, *_merge(intervals))
+
+    def remove(self, room_id, reservation_id):
+        """
+        Forget a reservation, e.g. after it has been cancelled.
+        """
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((self.remove, (room_id, reservation_id)))
+            intervals = [item for item in self._reservations.get(room_id, []) if item[2] != reservation_id]
+            self._reservations[room_id] = intervals
+            self._set_ranges(room_id, *_merge(intervals))
+
+    def _set_ranges(self, room_id, starts, ends):
+        # Replace the room's merged ranges; _busy only changes where they differ
+        old = set(zip(self._starts.get(room_id, ()), self._ends.get(room_id, ())))
+        new = set(zip(starts, ends))
+        for start, end in old - new:
+            i = bisect_left(self._busy, (start, end, room_id))
+            if i < len(self._busy) and self._busy[i] == (start, end, room_id):
+                del self._busy[i]
+        for start, end in new - old:
+            insort(self._busy, (start, end, room_id))
+            self._max_span = max(self._max_span, end - start)
+        self._starts[room_id], self._ends[room_id] = starts, ends
+
+    def set_room_bookable(self, room_id, bookable):
+        """
+        Mirror a change of Room.availability.
+        """
+        with self._lock:
+            if bookable:
+                self._room_ids.add(room_id)
+            else:
+                self._room_ids.discard(room_id)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def is_room_free(self, room_id, check_in, check_out):
+        """
+        Return True if the room has no reservation overlapping [check_in, check_out).
+        """
+        start, end = to_night(check_in), to_night(check_out)
+        with self._lock:
+            return self._is_free(room_id, start, end)
+
+    def free_room_ids(self, check_in, check_out):
+        """
+        Return the ids of bookable rooms that are free for [check_in, check_out).
+        """
+        start, end = to_night(check_in), to_night(check_out)
+        with self._lock:
+            # Ranges that overlap the stay start before check-out and, being
+            # at most _max_span long, after start - _max_span
+            lo = bisect_right(self._busy, (start - self._max_span, float("inf")))
+            hi = bisect_left(self._busy, (end,))
+            busy = {room_id for _, range_end, room_id in self._busy[lo:hi] if range_end > start}
+            return list(self._room_ids - busy)
+
+    def _is_free(self, room_id, start, end):
+        ends = self._ends.get(room_id)
+        if not ends:
+            return True
+        # First busy range that ends after our check-in night
+        i = bisect_right(ends, start)
+        return i == len(ends) or self._starts[room_id][i] >= end
+
+
+def _merge(intervals):
+    """
+    Collapse sorted (start, end, id) intervals into disjoint busy ranges.
+    """
+    starts, ends = [], []
+    for start, end, _ in intervals:
+        if ends and start <= ends[-1]:
+            if end > ends[-1]:
+                ends[-1] = end
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+# Shared index used by the request handlers
+availability_index = AvailabilityIndex()
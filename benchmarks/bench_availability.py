@@ -0,0 +1,124 @@
+"""
+Benchmark: availability index vs. a naive SQL overlap query.
+
+Seeds an in-memory SQLite database with synthetic rooms and reservations,
+then times "which rooms are free for [check_in, check_out)" both ways.
+
+Usage:
+    python benchmarks/bench_availability.py --rooms 10000 --reservations 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import and_, insert
+
+from availability import AvailabilityIndex
+from models import db, Hotel, Room, Reservation
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite://"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(num_rooms, num_reservations, horizon_days, seed_value=42):
+    rng = random.Random(seed_value)
+    db.metadata.create_all(db.engine, tables=[Hotel.__table__, Room.__table__, Reservation.__table__])
+    db.session.execute(insert(Hotel.__table__), [{
+        "id": 1, "name": "Bench Hotel", "location": "Nowhere", "description": "", "amenities": "",
+    }])
+    db.session.execute(insert(Room.__table__), [{
+        "id": room_id, "hotel_id": 1, "room_type": "Double Room", "description": "",
+        "price_per_night": 150, "availability": True, "max_guests": 2, "amenities": "WiFi",
+    } for room_id in range(1, num_rooms + 1)])
+
+    base = datetime(2025, 1, 1)
+    batch = []
+    for reservation_id in range(1, num_reservations + 1):
+        check_in = base + timedelta(days=rng.randrange(horizon_days))
+        batch.append({
+            "id": reservation_id, "user_id": 1, "room_id": rng.randint(1, num_rooms),
+            "check_in_date": check_in, "check_out_date": check_in + timedelta(days=rng.randint(1, 7)),
+            "total_price": 0.0, "status": "confirmed",
+        })
+        if len(batch) == 50000:
+            db.session.execute(insert(Reservation.__table__), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(Reservation.__table__), batch)
+    db.session.execute(db.text("CREATE INDEX bench_res_room_dates ON reservation (room_id, check_in_date, check_out_date)"))
+    db.session.commit()
+    return base
+
+
+def naive_free_rooms(check_in, check_out):
+    overlapping = db.session.query(Reservation.room_id).filter(
+        Reservation.status != "cancelled",
+        and_(Reservation.check_in_date < check_out, Reservation.check_out_date > check_in),
+    )
+    return [row.id for row in db.session.query(Room.id).filter(
+        Room.availability == True, ~Room.id.in_(overlapping)
+    )]
+
+
+def timed(fn, queries):
+    samples, results = [], []
+    for check_in, check_out in queries:
+        start = time.perf_counter()
+        results.append(sorted(fn(check_in, check_out)))
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples, results
+
+
+def report(label, samples):
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(f"{label:<14} p50={p50:8.2f} ms  p99={p99:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=10000)
+    parser.add_argument("--reservations", type=int, default=1000000)
+    parser.add_argument("--horizon-days", type=int, default=3650)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    app = build_app()
+    with app.app_context():
+        start = time.perf_counter()
+        base = seed(args.rooms, args.reservations, args.horizon_days)
+        print(f"Seeded {args.rooms} rooms / {args.reservations} reservations in {time.perf_counter() - start:.1f}s")
+
+        index = AvailabilityIndex(max_age=None)
+        start = time.perf_counter()
+        index.load_from_db(since=base.date())  # The synthetic stays start in the past
+        print(f"Index built in {time.perf_counter() - start:.2f}s")
+
+        rng = random.Random(7)
+        queries = []
+        for _ in range(args.queries):
+            check_in = base + timedelta(days=rng.randrange(args.horizon_days))
+            queries.append((check_in, check_in + timedelta(days=rng.randint(1, 14))))
+
+        naive_samples, naive_result = timed(naive_free_rooms, queries)
+        index_samples, index_result = timed(index.free_room_ids, queries)
+        assert naive_result == index_result, "index disagrees with SQL"
+
+        report("naive SQL", naive_samples)
+        report("interval index", index_samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: prompt tokens per /chat turn over long synthetic sessions.
+
+Compares the old prompt (last 5 rows, all user messages then all bot
+replies) with build_messages() plus running-summary folding. The LLM
+summarizer is replaced by a local stand-in that keeps the newest
+SUMMARY_MAX_TOKENS words, so only prompt shape is measured.
+
+Usage:
+    python benchmarks/bench_context.py --sessions 20 --turns 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_builder import (
+    RECENT_TURNS, SUMMARY_MAX_TOKENS, build_messages, estimate_tokens, fold_transcript, message_tokens,
+)
+
+SYSTEM = "You are a hotel reservation assistant. The user's name is guest."
+WORDS = ("suite double single pool breakfast parking late checkout airport shuttle spa gym "
+         "view balcony quiet floor crib pets dinner reservation dates price upgrade").split()
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def local_summarize(previous, transcript):
+    words = (previous + " " + transcript).split()
+    return " ".join(words[-SUMMARY_MAX_TOKENS:])
+
+
+def legacy_prompt(history, user_input):
+    recent = history[-5:][::-1]
+    return ([{"role": "system", "content": SYSTEM}]
+            + [{"role": "user", "content": m} for m, _ in recent]
+            + [{"role": "assistant", "content": r} for _, r in recent]
+            + [{"role": "user", "content": user_input}])
+
+
+def run_session(rng, turns, budget):
+    history, legacy_tokens, new_tokens = [], [], []
+    summary, folded = "", 0
+    for _ in range(turns):
+        user_input = sentence(rng, 3, 60)
+        legacy_tokens.append(sum(message_tokens(m) for m in legacy_prompt(history, user_input)))
+        messages = build_messages(SYSTEM, user_input, history[folded:][-RECENT_TURNS:], summary, budget)
+        new_tokens.append(sum(message_tokens(m) for m in messages))
+
+        history.append((user_input, sentence(rng, 20, 400)))
+        if len(history) - folded > RECENT_TURNS:
+            summary = local_summarize(summary, fold_transcript(history[folded:-RECENT_TURNS]))
+            folded = len(history) - RECENT_TURNS
+    return legacy_tokens, new_tokens
+
+
+def describe(label, samples):
+    samples = sorted(samples)
+    mean = sum(samples) / len(samples)
+    print(f"{label:<16} mean={mean:7.0f}  p50={samples[len(samples) // 2]:6d}  "
+          f"p99={samples[int(len(samples) * 0.99)]:6d}  max={samples[-1]:6d} tokens/turn")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=1500)
+    args = parser.parse_args()
+
+    rng = random.Random(99)
+    legacy, new = [], []
+    for _ in range(args.sessions):
+        old_tokens, new_tokens = run_session(rng, args.turns, args.budget)
+        legacy.extend(old_tokens)
+        new.extend(new_tokens)
+    describe("legacy (last 5)", legacy)
+    describe("context builder", new)
+
+    text = sentence(rng, 200, 200)
+    start = time.perf_counter()
+    for _ in range(10000):
+        estimate_tokens(text)
+    print(f"estimate_tokens: {(time.perf_counter() - start) / 10000 * 1e6:.1f} us per 200-word message")
+
+
+if __name__ == "__main__":
+    main()
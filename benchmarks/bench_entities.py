@@ -0,0 +1,76 @@
+"""
+Benchmark: per-message cost and coverage of the entity extractor.
+
+Compares the previous extract_entities (ISO dates, capitalised-word
+locations and substring room types on the preprocessed text) with
+EntityExtractor on the raw message, over the synthetic guest corpus.
+
+Usage:
+    python benchmarks/bench_entities.py --messages 20000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import guest_messages
+from entities import EntityExtractor, LocationGazetteer
+from nlp_utils import preprocess_input
+
+LEGACY_DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})")
+LEGACY_LOCATION_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b")
+LEGACY_ROOM_TYPES = ["single", "double", "suite", "deluxe"]
+
+
+def legacy_extract(text):
+    entities = {}
+    dates = LEGACY_DATE_PATTERN.findall(text)
+    if dates:
+        entities["check_in_date"] = dates[0]
+        if len(dates) > 1:
+            entities["check_out_date"] = dates[1]
+    for room_type in LEGACY_ROOM_TYPES:
+        if room_type in text:
+            entities["room_type"] = room_type
+            break
+    locations = LEGACY_LOCATION_PATTERN.findall(text)
+    if locations:
+        entities["location"] = locations[0]
+    return entities
+
+
+def run(label, fn, inputs):
+    samples, found = [], Counter()
+    for text in inputs:
+        start = time.perf_counter()
+        entities = fn(text)
+        samples.append(time.perf_counter() - start)
+        found.update(entities.keys())
+    samples.sort()
+    pct = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))] * 1e6
+    print(f"{label:<26} p50={pct(0.5):6.1f} us  p99={pct(0.99):6.1f} us  mean={sum(samples) / len(samples) * 1e6:6.1f} us")
+    print(f"{'':<26} messages with: " + ", ".join(f"{key}={count}" for key, count in sorted(found.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    messages = guest_messages.generate(args.messages, seed=5, common_share=0.3)
+    # The chat route used to extract from the preprocessed text
+    preprocessed = [preprocess_input(message) for message in messages]
+    extractor = EntityExtractor(LocationGazetteer(["New York, USA", "Paris, France", "Lisbon, Portugal",
+                                                   "Tokyo, Japan", "Cape Town, South Africa"]))
+
+    run("legacy (preprocessed)", legacy_extract, preprocessed)
+    run("EntityExtractor (raw)", extractor.extract, messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: /conversation_history for a guest with a long history.
+
+Seeds one user with N turns in a throwaway SQLite database, then compares
+the old load-everything approach with the streaming endpoint: peak Python
+memory for the full history (limit=0), page latency at increasing depth
+(keyset cursor vs OFFSET), and a conditional request answered with 304.
+
+Usage:
+    python benchmarks/bench_history.py --turns 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/history.db")
+# No background jobs on the benchmark database
+os.environ["SCHEDULER_MODE"] = "worker"
+
+import logging
+
+from app import create_app
+from history_pages import encode_cursor
+from models import db, Conversation
+from sqlalchemy import insert, text
+from sqlite_schema import create_all_tables
+
+app = create_app()
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def seed(turns):
+    with app.app_context():
+        create_all_tables()
+        db.session.execute(text("INSERT INTO user (id, username, email, password) VALUES (1, 'guest', 'g@x.io', 'xxxxxxxxxx')"))
+        db.session.commit()
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        rows = [{"user_id": 1, "message": f"question number {i} about the pool and breakfast hours",
+                 "response": "Our pool is open from 7am to 10pm and breakfast is served until 10:30. " * 4,
+                 "created_at": start + timedelta(minutes=i), "updated_at": start + timedelta(minutes=i)}
+                for i in range(turns)]
+        for offset in range(0, turns, 5000):
+            db.session.execute(insert(Conversation), rows[offset:offset + 5000])
+        db.session.commit()
+
+
+def load_everything():
+    # What the endpoint used to do before returning
+    with app.app_context():
+        conversations = Conversation.query.filter_by(user_id=1).order_by(Conversation.created_at.desc()).all()
+        return [{"message": c.message, "response": c.response, "date": c.created_at.strftime("%Y-%m-%d %H:%M:%S")}
+                for c in conversations]
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=50000)
+    args = parser.parse_args()
+    seed(args.turns)
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+
+    def stream_all():
+        response = client.get("/conversation_history?limit=0&format=ndjson", buffered=False)
+        lines = sum(chunk.count(b"\n") for chunk in response.response)
+        response.close()
+        assert lines == args.turns + 1, lines
+
+    print(f"Peak memory, full history of {args.turns:,} turns: "
+          f".all() {peak_memory(load_everything):.1f} MB, streamed NDJSON {peak_memory(stream_all):.1f} MB")
+
+    page_size = 50
+    for depth in (0, args.turns // 2, args.turns - page_size):
+        with app.app_context():
+            row = db.session.execute(text(
+                "SELECT created_at, id FROM conversation WHERE user_id = 1 ORDER BY created_at DESC, id DESC "
+                f"LIMIT 1 OFFSET {max(depth - 1, 0)}")).one()
+        cursor = encode_cursor(datetime.fromisoformat(str(row[0])), row[1]) if depth else None
+        url = f"/conversation_history?limit={page_size}" + (f"&before={cursor}" if cursor else "")
+
+        start = time.perf_counter()
+        for _ in range(20):
+            response = client.get(url, buffered=True)
+            response.close()
+        keyset_ms = (time.perf_counter() - start) / 20 * 1000
+        etag = response.headers["ETag"]
+
+        with app.app_context():
+            start = time.perf_counter()
+            for _ in range(20):
+                Conversation.query.filter_by(user_id=1).order_by(
+                    Conversation.created_at.desc(), Conversation.id.desc()).offset(depth).limit(page_size).all()
+            offset_ms = (time.perf_counter() - start) / 20 * 1000
+
+        start = time.perf_counter()
+        cached = client.get(url, headers={"If-None-Match": etag}, buffered=True)
+        cached_ms = (time.perf_counter() - start) * 1000
+        print(f"Page at depth {depth:>6}: keyset endpoint {keyset_ms:6.2f} ms, OFFSET query alone {offset_ms:6.2f} ms, "
+              f"If-None-Match -> {cached.status_code} in {cached_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: query plans and timings of the hot queries before and after
+migration e4a9c03b7d15 (partial index, duplicate user_id indexes dropped).
+
+Seeds a throwaway SQLite database with synthetic users, turns, memories,
+follow-ups and reservations, then for each index set prints the
+EXPLAIN QUERY PLAN and mean latency of every hot query, plus the cost of
+writing a batch of conversation turns and memories.
+
+Usage:
+    python benchmarks/bench_indexes.py --users 500 --turns 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/indexes.db")
+
+import logging
+
+from sqlalchemy import insert, text
+
+from app import create_app
+from models import db, Conversation, FollowUp, Memory, Reservation
+
+app = create_app()
+logging.getLogger().setLevel(logging.WARNING)
+
+# Indexes that differ between the two schemas; everything else is shared
+BEFORE = [
+    "CREATE INDEX ix_conversation_user_id ON conversation (user_id)",
+    "CREATE INDEX idx_conversation_user_id ON conversation (user_id)",
+    "CREATE INDEX ix_memory_user_id ON memory (user_id)",
+    "CREATE INDEX idx_memory_user_id ON memory (user_id)",
+    "CREATE INDEX ix_follow_up_user_id ON follow_up (user_id)",
+]
+AFTER = [
+    "CREATE INDEX idx_reservation_room_live ON reservation (room_id, check_in_date) WHERE status <> 'cancelled'",
+]
+
+NOW = datetime(2025, 6, 1)
+HOT_QUERIES = {
+    "history page": (
+        "SELECT id, message, response, created_at FROM conversation WHERE user_id = :user_id "
+        "ORDER BY created_at DESC, id DESC LIMIT 50", {}),
+    "last turn": (
+        "SELECT * FROM conversation WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 1", {}),
+    "memories": (
+        "SELECT key, value FROM memory WHERE user_id = :user_id", {}),
+    "reservations": (
+        "SELECT * FROM reservation WHERE user_id = :user_id ORDER BY check_in_date, id LIMIT 50", {}),
+    "room overlap": (
+        "SELECT * FROM reservation WHERE room_id = :room_id AND status != 'cancelled' "
+        "AND check_in_date < :check_out AND check_out_date > :check_in LIMIT 1",
+        {"check_in": str(NOW), "check_out": str(NOW + timedelta(days=3))}),
+}
+
+
+def index_names(statements):
+    return [statement.split()[2] for statement in statements]
+
+
+def use_indexes(create, drop):
+    with db.engine.begin() as conn:
+        for name in index_names(drop):
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        for statement in create:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def seed(users, turns, rooms):
+    rng = random.Random(7)
+    db.metadata.create_all(db.engine, tables=[
+        Conversation.__table__, Memory.__table__, FollowUp.__table__, Reservation.__table__,
+    ])
+    start = NOW - timedelta(days=365)
+    rows = []
+    for user_id in range(1, users + 1):
+        for i in range(turns):
+            created = start + timedelta(minutes=rng.randrange(525600))
+            rows.append({"user_id": user_id, "message": "what time is breakfast", "response": "7 to 10:30",
+                         "created_at": created, "updated_at": created})
+    for offset in range(0, len(rows), 10000):
+        db.session.execute(insert(Conversation), rows[offset:offset + 10000])
+    db.session.execute(insert(Memory), [
+        {"user_id": user_id, "key": key, "value": "x"}
+        for user_id in range(1, users + 1) for key in ("preferred_room_type", "frequent_destination", "budget")
+    ])
+    reservations = []
+    for i in range(users * 10):
+        check_in = start + timedelta(days=rng.randrange(500))
+        reservations.append({
+            "user_id": rng.randint(1, users), "room_id": rng.randint(1, rooms), "check_in_date": check_in,
+            "check_out_date": check_in + timedelta(days=rng.randint(1, 5)), "total_price": 300.0,
+            "status": "cancelled" if rng.random() < 0.3 else "confirmed",
+        })
+    db.session.execute(insert(Reservation), reservations)
+    db.session.commit()
+
+
+def run_queries(users, rooms, repeat):
+    rng = random.Random(11)
+    results = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        params = dict(params, user_id=users // 2, room_id=rooms // 2)
+        plan = [row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql), params)]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            params.update(user_id=rng.randint(1, users), room_id=rng.randint(1, rooms))
+            db.session.execute(text(sql), params).fetchall()
+        results[name] = ((time.perf_counter() - start) / repeat * 1000, plan)
+    return results
+
+
+def write_cost(users, batch):
+    rows = [{"user_id": i % users + 1, "message": "hi", "response": "hello", "created_at": NOW, "updated_at": NOW}
+            for i in range(batch)]
+    start = time.perf_counter()
+    db.session.execute(insert(Conversation), rows)
+    db.session.execute(insert(Memory), [{"user_id": i % users + 1, "key": f"bench_{i}", "value": "x"}
+                                        for i in range(batch)])
+    db.session.commit()
+    elapsed = (time.perf_counter() - start) * 1000
+    db.session.execute(text("DELETE FROM conversation WHERE created_at = :now AND message = 'hi'"), {"now": str(NOW)})
+    db.session.execute(text("DELETE FROM memory WHERE key LIKE 'bench_%'"))
+    db.session.commit()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=200, help="turns per user")
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=20000, help="rows per table in the write test")
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed(args.users, args.turns, args.rooms)
+        print(f"Seeded {args.users * args.turns:,} turns, {args.users * 3:,} memories, "
+              f"{args.users * 10:,} reservations")
+        measured = {}
+        for label, create, drop in (("before", BEFORE, AFTER), ("after", AFTER, BEFORE)):
+            use_indexes(create, drop)
+            measured[label] = (run_queries(args.users, args.rooms, args.repeat), write_cost(args.users, args.batch))
+
+    for name in HOT_QUERIES:
+        (before_ms, before_plan), (after_ms, after_plan) = measured["before"][0][name], measured["after"][0][name]
+        print(f"\n{name}: {before_ms:.3f} ms -> {after_ms:.3f} ms")
+        print(f"  before: {'; '.join(before_plan)}")
+        print(f"  after:  {'; '.join(after_plan)}")
+    print(f"\nWriting {args.batch:,} turns + {args.batch:,} memories: "
+          f"{measured['before'][1]:.0f} ms -> {measured['after'][1]:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: trained hashed n-gram intent classifier vs the keyword rules.
+
+Trains IntentClassifier on synthetic labeled messages, evaluates both on a
+held-out sample (a different seed; it shares templates with the training
+data, so the classifier's accuracy is an upper bound), and reports per-message latency,
+batch throughput and artifact load time.
+
+Usage:
+    python benchmarks/bench_intent.py --train 20000 --test 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import guest_messages
+from intent_model import IntentClassifier
+from nlp_utils import detect_intent_keywords
+
+
+def accuracy(predicted, expected):
+    return sum(p == e for p, e in zip(predicted, expected)) / len(expected)
+
+
+def per_message_us(fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--train", type=int, default=20000)
+    parser.add_argument("--test", type=int, default=5000)
+    args = parser.parse_args()
+
+    train_texts, train_intents = zip(*guest_messages.generate_labeled(args.train, seed=1))
+    test_texts, test_intents = zip(*guest_messages.generate_labeled(args.test, seed=2))
+    # The keyword rules were written for preprocessed (lowercased) text
+    lowered = [text.lower() for text in test_texts]
+
+    start = time.perf_counter()
+    model = IntentClassifier.train(list(train_texts), list(train_intents))
+    print(f"Training on {args.train} messages: {time.perf_counter() - start:.2f} s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "intent_model.npz")
+        model.save(path)
+        start = time.perf_counter()
+        model = IntentClassifier.load(path)
+        print(f"Artifact: {os.path.getsize(path) / 1e6:.1f} MB, load {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    keyword = [detect_intent_keywords(text) for text in lowered]
+    single = [model.predict_one(text)[0] for text in test_texts]
+    batch = [intent for intent, _ in model.predict(list(test_texts))]
+    assert single == batch, "predict_one and predict disagree"
+
+    print(f"Accuracy  keywords={accuracy(keyword, test_intents):.3f}  classifier={accuracy(single, test_intents):.3f}")
+    print(f"Latency   keywords={per_message_us(detect_intent_keywords, lowered):.1f} us/msg  "
+          f"classifier={per_message_us(model.predict_one, test_texts):.1f} us/msg")
+    start = time.perf_counter()
+    model.predict(list(test_texts))
+    elapsed = time.perf_counter() - start
+    print(f"Batch     classifier={len(test_texts) / elapsed:,.0f} msg/s ({elapsed / len(test_texts) * 1e6:.1f} us/msg)")
+
+    errors = Counter((e, p) for p, e in zip(keyword, test_intents) if p != e)
+    print("Most common keyword-rule mistakes (expected -> predicted):")
+    for (expected, predicted), count in errors.most_common(5):
+        print(f"  {expected} -> {predicted}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: first-token latency of the pooled LlamaClient vs. bare requests.post.
+
+Talks to the local stub server, so the numbers isolate client overhead
+(connection setup, pooling) from model latency. Also checks the retry path
+and the asyncio client.
+
+Usage:
+    python benchmarks/bench_llm_client.py --calls 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from llm_client import AsyncLlamaClient, LlamaClient, build_payload
+from stub_llama_server import start_stub_server
+
+MESSAGES = [{"role": "user", "content": "Do you have a suite free next weekend?"}]
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))] * 1000
+
+
+def first_token_bare(base_url):
+    start = time.perf_counter()
+    with requests.post(f"{base_url}/chat/completions", json=build_payload("stub", MESSAGES, stream=True), stream=True) as response:
+        chunks = response.iter_content(chunk_size=None)
+        next(chunks)
+        elapsed = time.perf_counter() - start
+        for _ in chunks:
+            pass
+    return elapsed
+
+
+def first_token_pooled(client):
+    start = time.perf_counter()
+    with client.stream(MESSAGES) as response:
+        chunks = response.iter_content(chunk_size=None)
+        next(chunks)
+        elapsed = time.perf_counter() - start
+        for _ in chunks:
+            pass
+    return elapsed
+
+
+async def async_roundtrips(base_url, calls):
+    client = AsyncLlamaClient(base_url=base_url, api_key="stub")
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(client.complete(MESSAGES) for _ in range(calls)))
+        return time.perf_counter() - start
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server, base_url, config = start_stub_server()
+
+    bare = [first_token_bare(base_url) for _ in range(args.calls)]
+    bare_connections = config.connections
+
+    client = LlamaClient(base_url=base_url, api_key="stub")
+    pooled = [first_token_pooled(client) for _ in range(args.calls)]
+    pooled_connections = config.connections - bare_connections
+
+    print(f"requests.post   p50={percentile(bare, 0.5):6.2f} ms  p99={percentile(bare, 0.99):6.2f} ms  connections={bare_connections}")
+    print(f"LlamaClient     p50={percentile(pooled, 0.5):6.2f} ms  p99={percentile(pooled, 0.99):6.2f} ms  connections={pooled_connections}")
+
+    # Retries: the first two requests fail with 503, the third succeeds
+    server.shutdown()
+    server, base_url, config = start_stub_server(fail_first=2)
+    retrying = LlamaClient(base_url=base_url, api_key="stub", backoff=0.01)
+    assert retrying.complete(MESSAGES) == config.reply
+    print(f"Retry path      recovered after {config.requests - 1} injected failures")
+
+    elapsed = asyncio.run(async_roundtrips(base_url, args.calls))
+    print(f"AsyncLlamaClient {args.calls} concurrent completions in {elapsed * 1000:.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: tokens/sec streamed through /chat generate() with logging on and off.
+
+Each mode runs in a fresh interpreter that sends --requests free-form
+/chat turns, answered by the local stub LLM server with a --words word
+reply (one streamed chunk per word), to a seeded SQLite database, and
+reads the stream to the end; modes take turns and each reports its
+median over --runs. Log output goes to /dev/null, so only the
+cost of producing it is measured.
+
+Modes:
+    off          LOG_LEVEL=INFO through the queue handler (production)
+    debug        LOG_LEVEL=DEBUG through the queue handler, chunks sampled
+    debug-sync   LOG_LEVEL=DEBUG written synchronously by a plain StreamHandler
+    legacy-off   the old per-chunk f-strings (raw chunk, then the whole
+                 accumulated response), DEBUG disabled
+    legacy-on    the same with DEBUG enabled and a synchronous handler
+
+Usage:
+    python benchmarks/bench_logging.py --requests 30 --words 4000 --runs 5
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ROOT))
+sys.path.insert(0, ROOT)
+
+MODES = ["off", "debug", "debug-sync", "legacy-off", "legacy-on"]
+MESSAGE = "tell me about the spa and the rooftop bar"
+
+
+def seed():
+    from app import create_app
+    from models import db, User
+    from sqlalchemy import text
+
+    with create_app().app_context():
+        db.session.execute(text("CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(100), email VARCHAR(120), "
+                                "password VARCHAR(500), preferred_hotel_chain VARCHAR(100), loyalty_points INTEGER, "
+                                "created_at DATETIME, updated_at DATETIME)"))
+        db.session.commit()
+        db.metadata.create_all(db.engine, tables=[t for t in db.metadata.sorted_tables if t.name != "user"])
+        db.session.add(User(id=1, username="guest", email="g@x.io", password="x" * 10))
+        db.session.commit()
+
+
+def legacy_deltas(iter_completion_deltas, logger):
+    # What generate() used to do for every chunk
+    def wrapped(chunks):
+        accumulated = ""
+        for content in iter_completion_deltas(chunks):
+            logger.debug(f"Raw chunk: {content!r}")
+            accumulated += content
+            logger.debug(f"Accumulated response: {accumulated}")
+            yield content
+    return wrapped
+
+
+def child(mode, requests):
+    from structured_logging import configure_logging
+
+    devnull = open(os.devnull, "w")
+    level = "DEBUG" if mode in ("debug", "debug-sync", "legacy-on") else "INFO"
+    if mode in ("off", "debug", "legacy-off"):
+        configure_logging(level, stream=devnull)
+    else:
+        logging.basicConfig(level=level, stream=devnull)
+
+    import app as appmod
+
+    if mode.startswith("legacy"):
+        appmod.iter_completion_deltas = legacy_deltas(appmod.iter_completion_deltas, appmod.logger)
+
+    app = appmod.create_app()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+    client.post("/chat", json={"message": MESSAGE}).get_data()  # warm-up
+
+    chunks = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.post("/chat", json={"message": MESSAGE}, buffered=False)
+        assert response.status_code == 200, response.status_code
+        chunks += sum(body.count(b"data: ") for body in response.response)
+        response.close()
+    elapsed = time.perf_counter() - started
+    app.extensions["conversation_writer"].close()
+    print(json.dumps({"tokens_per_sec": chunks / elapsed, "ms_per_request": elapsed * 1000 / requests,
+                      "chunks": chunks}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--words", type=int, default=4000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--child", choices=["seed"] + MODES)
+    args = parser.parse_args()
+    if args.child == "seed":
+        return seed()
+    if args.child:
+        return child(args.child, args.requests)
+
+    from stub_llama_server import start_stub_server
+
+    reply = " ".join(f"word{i}" for i in range(args.words))
+    server, url, _ = start_stub_server(reply=reply)
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/logging.db", LLAMA_API_BASE_URL=url,
+               SCHEDULER_MODE="worker", RESPONSE_CACHE="0")
+    subprocess.run([sys.executable, __file__, "--child", "seed"], env=env, check=True, capture_output=True)
+
+    results = {mode: [] for mode in args.modes}
+    for _ in range(args.runs):
+        for mode in args.modes:
+            output = subprocess.run([sys.executable, __file__, "--child", mode, "--requests", str(args.requests)],
+                                    env=env, check=True, capture_output=True, text=True).stdout
+            results[mode].append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{args.requests} requests of {args.words} streamed tokens each, median of {args.runs} runs")
+    for mode, runs in results.items():
+        tokens_per_sec = statistics.median(run["tokens_per_sec"] for run in runs)
+        ms_per_request = statistics.median(run["ms_per_request"] for run in runs)
+        print(f"{mode:<11} {tokens_per_sec:9,.0f} tokens/s  {ms_per_request:8.1f} ms/request")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
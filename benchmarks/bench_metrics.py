@@ -0,0 +1,67 @@
+"""
+Benchmark: cost of the /chat stage instrumentation and of a /metrics scrape.
+
+Times Histogram.observe and Histogram.time (the with-block used around
+each stage) single-threaded and from --threads threads at once, then the
+render of a registry holding every /chat stage.
+
+Usage:
+    python benchmarks/bench_metrics.py --iterations 200000 --threads 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Registry
+
+STAGES = ["preprocess", "user_read", "intent", "entities", "memory_read", "context_read",
+          "llm_first_token", "llm_stream", "persistence_lag"]
+
+
+def per_call_ns(fn, iterations, threads=1):
+    def work():
+        for i in range(iterations):
+            fn(i)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - started) * 1e9 / (iterations * threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    registry = Registry()
+    histogram = registry.histogram("chat_stage_seconds", "Stage latency.", labelname="stage")
+
+    def observe(i):
+        histogram.observe(i * 1e-6 % 2, STAGES[i % len(STAGES)])
+
+    def timed(i):
+        with histogram.time(STAGES[i % len(STAGES)]):
+            pass
+
+    baseline = per_call_ns(lambda i: STAGES[i % len(STAGES)], args.iterations)
+    for label, fn in (("observe", observe), ("time() block", timed)):
+        single = per_call_ns(fn, args.iterations) - baseline
+        shared = per_call_ns(fn, args.iterations // args.threads, args.threads) - baseline
+        print(f"{label:<13} {single:7.0f} ns/call, {shared:7.0f} ns/call with {args.threads} threads")
+
+    started = time.perf_counter()
+    body = registry.render()
+    print(f"render        {(time.perf_counter() - started) * 1000:7.2f} ms for {len(body.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: batch NLP pipeline vs. calling the per-message functions.
+
+Checks the batch results are identical to preprocess_input /
+detect_intent / extract_entities / analyze_sentiment, then reports
+messages/sec for the per-message loop, the batch API in-process and the
+batch API across a process pool.
+
+Usage:
+    python benchmarks/bench_nlp_batch.py --messages 20000 --processes 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import guest_messages
+import nlp_batch
+from nlp_batch import analyze_batch
+from nlp_utils import analyze_sentiment, detect_intent, extract_entities, preprocess_input
+
+
+def per_message(messages):
+    results = []
+    for message in messages:
+        text = preprocess_input(message)
+        results.append({
+            "text": text,
+            "intent": detect_intent(text),
+            "entities": extract_entities(message),
+            "sentiment": analyze_sentiment(text),
+        })
+    return results
+
+
+def timed(label, fn, count):
+    nlp_batch._corrections.clear()  # start every run cold
+    start = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count / elapsed:10,.0f} msg/s  ({elapsed:.2f}s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    messages = guest_messages.generate(args.messages)
+    baseline = timed("per-message functions", lambda: per_message(messages), len(messages))
+    batch = timed("analyze_batch (1 process)", lambda: list(analyze_batch(messages)), len(messages))
+    assert batch == baseline, "batch output differs from per-message output"
+    if args.processes > 1:
+        parallel = timed(f"analyze_batch ({args.processes} processes)",
+                         lambda: list(analyze_batch(messages, processes=args.processes)), len(messages))
+        assert parallel == baseline, "parallel output differs from per-message output"
+    print("Outputs identical to the per-message functions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: p50/p99 latency of preprocess_input on a realistic message corpus.
+
+Compares the original behaviour (lookup_compound over the whole cleaned
+message, every time) with the memoized, lexicon-aware corrector, and shows
+how the two disagree on domain words, dates and numbers.
+
+Usage:
+    python benchmarks/bench_preprocess.py --messages 3000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import guest_messages
+from nlp_utils import clean_text, get_sym_spell, preprocess_input, spelling_corrector
+
+
+def legacy_preprocess(message):
+    return get_sym_spell().lookup_compound(clean_text(message), max_edit_distance=2)[0].term
+
+
+def measure(fn, messages):
+    samples, outputs = [], []
+    for message in messages:
+        start = time.perf_counter()
+        outputs.append(fn(message))
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples, outputs
+
+
+def describe(label, samples):
+    pct = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+    print(f"{label:<22} p50={pct(0.5):7.3f} ms  p99={pct(0.99):7.3f} ms  mean={sum(samples) / len(samples) * 1000:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=3000)
+    args = parser.parse_args()
+
+    get_sym_spell()  # exclude dictionary loading from the timings
+    messages = guest_messages.generate(args.messages, seed=11)
+
+    legacy_samples, legacy_outputs = measure(legacy_preprocess, messages)
+    describe("legacy lookup_compound", legacy_samples)
+    new_samples, new_outputs = measure(preprocess_input, messages)
+    describe("memoized + lexicon", new_samples)
+    print(f"Cache: {spelling_corrector.stats()}")
+
+    shown = 0
+    for message, old, new in zip(messages, legacy_outputs, new_outputs):
+        if old != new and shown < 5:
+            print(f"  {message!r}\n    legacy: {old!r}\n    now:    {new!r}")
+            shown += 1
+
+
+if __name__ == "__main__":
+    main()
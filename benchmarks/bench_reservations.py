@@ -0,0 +1,140 @@
+"""
+Benchmark and query-count check: /view_reservations for a frequent guest.
+
+Seeds one user with N reservations across several hotels in a throwaway
+SQLite database, then counts the SQL statements and time per request for
+the old lazy-loading approach and the endpoint, with and without filters
+and cursor pages. Fails with an AssertionError if the endpoint issues
+more than MAX_QUERIES_PER_PAGE statements for any page, so an N+1
+regression fails the run.
+
+The app is built with SCHEDULER_MODE=worker so no background job runs
+queries on the engine while they are being counted.
+
+Usage:
+    python benchmarks/bench_reservations.py --reservations 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/reservations.db")
+os.environ["SCHEDULER_MODE"] = "worker"
+
+import logging
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from models import db, Hotel, Room, Reservation
+from sqlite_schema import create_all_tables
+
+app = create_app()
+logging.getLogger().setLevel(logging.WARNING)
+
+# One SELECT for the page; anything more means rows are being loaded lazily
+MAX_QUERIES_PER_PAGE = 1
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def seed(count, hotels=20, rooms_per_hotel=10):
+    with app.app_context():
+        create_all_tables()
+        db.session.execute(insert(Hotel.__table__), [{
+            "id": h, "name": f"Hotel {h}", "location": f"City {h % 5}", "description": "", "amenities": "Pool",
+        } for h in range(1, hotels + 1)])
+        db.session.execute(insert(Room.__table__), [{
+            "id": r, "hotel_id": (r - 1) // rooms_per_hotel + 1, "room_type": ("Single", "Double", "Suite")[r % 3],
+            "description": "", "price_per_night": 100 + r % 7 * 25, "availability": True, "max_guests": 2,
+            "amenities": "WiFi",
+        } for r in range(1, hotels * rooms_per_hotel + 1)])
+        start = datetime(2025, 1, 1)
+        db.session.execute(insert(Reservation.__table__), [{
+            "user_id": 1, "room_id": i % (hotels * rooms_per_hotel) + 1,
+            "check_in_date": start + timedelta(days=i), "check_out_date": start + timedelta(days=i + 2),
+            "total_price": 250.0, "status": "cancelled" if i % 4 == 0 else "confirmed",
+        } for i in range(count)])
+        db.session.commit()
+
+
+def lazy_reservations():
+    # What the endpoint used to do: one query for the reservations, then one per room
+    reservations = Reservation.query.filter_by(user_id=1).all()
+    return [{"id": r.id, "room_type": r.room.room_type, "hotel": r.room.hotel.name} for r in reservations]
+
+
+def measure(fn, repeat=10):
+    with count_queries() as statements:
+        fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return len(statements), (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reservations", type=int, default=500)
+    args = parser.parse_args()
+    seed(args.reservations)
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+
+    def old():
+        # A fresh session per call, like a fresh request, so nothing is already in the identity map
+        with app.app_context():
+            lazy_reservations()
+
+    queries, ms = measure(old)
+    print(f"Lazy loading, {args.reservations} reservations: {queries} queries, {ms:.2f} ms")
+
+    urls = [
+        "/view_reservations?limit=0",
+        "/view_reservations",
+        "/view_reservations?status=confirmed&limit=100",
+        "/view_reservations?from=2025-03-01&to=2025-06-01&limit=20",
+    ]
+    for url in urls:
+        queries, ms = measure(lambda: client.get(url))
+        print(f"{url:<60} {queries} queries, {ms:.2f} ms")
+        assert queries <= MAX_QUERIES_PER_PAGE, f"{url} issued {queries} queries (N+1 regression)"
+
+    # Walk every page with the cursor and check that together they are the full list
+    seen, pages, url = [], 0, "/view_reservations?limit=50"
+    with count_queries() as statements:
+        while url:
+            body = client.get(url).get_json()
+            seen.extend(item["id"] for item in body["reservations"])
+            pages += 1
+            url = f"/view_reservations?limit=50&after={body['next_cursor']}" if body["next_cursor"] else None
+    print(f"Cursor walk: {pages} pages, {len(statements)} queries, {len(seen)} reservations")
+    assert len(statements) <= pages * MAX_QUERIES_PER_PAGE, \
+        f"cursor walk issued {len(statements)} queries for {pages} pages (N+1 regression)"
+    full = [item["id"] for item in client.get("/view_reservations?limit=0").get_json()["reservations"]]
+    assert seen == full, "cursor pages do not add up to the full list"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: hit rate, saved tokens and lookup cost of the shared response cache.
+
+Replays the synthetic guest corpus through the same decision /chat makes
+(intent, entities, key_for) and stores a fixed-size fake answer on every
+miss, once with exact keys only and once with MinHash near-duplicates.
+
+Usage:
+    python benchmarks/bench_response_cache.py --messages 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import guest_messages
+from nlp_utils import detect_intent, extract_entities, preprocess_input
+from response_cache import ResponseCache
+
+ANSWER = ["Breakfast ", "is served ", "from 7 to 10:30 ", "in the lobby restaurant."] * 10
+PROMPT_TOKENS = 60
+
+
+def replay(turns, similarity):
+    cache = ResponseCache(similarity=similarity)
+    lookup_time, lookups = 0.0, 0
+    for text, intent, entities in turns:
+        key = cache.key_for(text, intent, entities)
+        if key is None:
+            continue
+        start = time.perf_counter()
+        parts = cache.get(key)
+        lookup_time += time.perf_counter() - start
+        lookups += 1
+        if parts is None:
+            cache.put(key, ANSWER, prompt_tokens=PROMPT_TOKENS)
+    stats = cache.stats()
+    print(f"similarity={similarity or 'off':<5} cacheable={lookups / len(turns):.1%} of turns  "
+          f"hit_rate={stats['hit_rate']:.1%} (similar {stats['similar_hits']})  "
+          f"saved tokens prompt={stats['saved_prompt_tokens']:,} completion={stats['saved_completion_tokens']:,}  "
+          f"lookup={lookup_time / max(lookups, 1) * 1e6:.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    messages = guest_messages.generate(args.messages, seed=9)
+    turns = []
+    for message in messages:
+        text = preprocess_input(message)
+        turns.append((text, detect_intent(text), extract_entities(message)))
+    replay(turns, similarity=0)
+    replay(turns, similarity=0.5)
+
+
+if __name__ == "__main__":
+    main()
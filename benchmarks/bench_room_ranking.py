@@ -0,0 +1,101 @@
+"""
+Benchmark: top-k room ranking latency over a large synthetic inventory.
+
+Builds a RoomRankingIndex over N rooms (default 100k across 2,000 hotels)
+and times top_k for several preference vectors against a plain Python
+filter-score-sort over the same rows, checking both agree on the results.
+
+Usage:
+    python benchmarks/bench_room_ranking.py --rooms 100000 --k 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from room_ranking import WEIGHTS, RoomRankingIndex, amenity_key, parse_amenities
+
+ROOM_TYPES = ["Single Room", "Double Room", "Twin Room", "Suite", "Deluxe Suite", "King Room"]
+ROOM_AMENITIES = ["WiFi", "AC", "TV", "Mini Fridge", "Mini Bar", "Jacuzzi", "Balcony", "Sea View", "Safe", "Kettle"]
+HOTEL_AMENITIES = ["Pool", "Gym", "Spa", "Parking", "Restaurant", "Bar", "Airport Shuttle", "Pet Friendly"]
+CITIES = ["New York, USA", "Paris, France", "Lisbon, Portugal", "Tokyo, Japan", "Cape Town, South Africa"]
+
+PREFERENCES = [
+    {},
+    {"budget": 150},
+    {"guests": 3, "amenities": ["wifi", "pool"]},
+    {"budget": 250, "guests": 2, "amenities": ["jacuzzi", "spa", "sea view"], "room_type": "suite"},
+    {"location": "lisbon", "amenities": ["parking", "pet friendly"]},
+]
+
+
+def generate_rows(rooms, hotels, seed=0):
+    rng = random.Random(seed)
+    hotel_info = [(", ".join(rng.sample(HOTEL_AMENITIES, rng.randint(1, 5))), round(rng.uniform(2.5, 5.0), 1),
+                   rng.choice(CITIES)) for _ in range(hotels)]
+    rows = []
+    for room_id in range(1, rooms + 1):
+        hotel_id = rng.randrange(hotels)
+        amenities, rating, location = hotel_info[hotel_id]
+        rows.append((room_id, hotel_id + 1, rng.choice(ROOM_TYPES), float(rng.randint(60, 600)), rng.randint(1, 6),
+                     ", ".join(rng.sample(ROOM_AMENITIES, rng.randint(2, 7))), rng.random() > 0.05,
+                     amenities, rating, location))
+    return rows
+
+
+def naive_top_k(rows, k, budget=None, guests=None, amenities=(), room_type=None, location=None):
+    wanted = {amenity_key(name) for name in amenities}
+    candidates = [row for row in rows if row[6] and (not guests or row[4] >= guests)
+                  and (budget is None or row[3] <= budget) and (not location or location in row[9].lower())]
+    if not candidates:
+        return []
+    ceiling = budget or max(row[3] for row in candidates)
+    scored = []
+    for row in candidates:
+        score = WEIGHTS["price"] * (1 - row[3] / ceiling) + WEIGHTS["rating"] * row[8] / 5
+        if wanted:
+            present = parse_amenities(row[5]) | parse_amenities(row[7])
+            score += WEIGHTS["amenities"] * len(wanted & present) / len(amenities)
+        if room_type and room_type in row[2].lower():
+            score += WEIGHTS["room_type"]
+        scored.append((-score, row[3], row[0]))
+    scored.sort()
+    return [room_id for _, _, room_id in scored[:k]]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return result, samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=100000)
+    parser.add_argument("--hotels", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rooms, args.hotels)
+    index = RoomRankingIndex()
+    start = time.perf_counter()
+    index.load(rows)
+    print(f"Indexed {len(index):,} rooms in {time.perf_counter() - start:.2f} s")
+
+    for preferences in PREFERENCES:
+        ranked, p50, p99 = timed(lambda: index.top_k(args.k, **preferences), args.repeat)
+        expected, naive_p50, _ = timed(lambda: naive_top_k(rows, args.k, **preferences), 3)
+        assert [room_id for room_id, _ in ranked] == expected, f"ranking differs for {preferences}"
+        print(f"{str(preferences):<95} top_k p50={p50:6.2f} ms p99={p99:6.2f} ms   python loop={naive_p50:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
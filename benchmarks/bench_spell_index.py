@@ -0,0 +1,120 @@
+"""
+Benchmark: SymSpell cold start and per-worker memory, text load vs. mmap index.
+
+Each mode runs in a fresh interpreter: it loads the dictionary, runs
+lookup_compound over a message corpus, and reports load time plus RSS/PSS
+and private memory from /proc/self/smaps_rollup. The "workers" figures
+fork N children after loading and average what each child adds privately,
+which is what a pre-forked gunicorn deployment pays per worker.
+
+Usage:
+    python benchmarks/bench_spell_index.py --workers 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DICTIONARY = os.path.join(ROOT, "frequency_dictionary_en_82_765.txt")
+
+
+def memory():
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "private_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def child(mode, workers):
+    import guest_messages
+    from symspellpy import SymSpell
+    from spell_index import load_index, index_path_for
+
+    baseline = memory()
+    start = time.perf_counter()
+    if mode == "text":
+        sym_spell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
+        sym_spell.load_dictionary(DICTIONARY, term_index=0, count_index=1)
+    else:
+        sym_spell = load_index(index_path_for(DICTIONARY))
+    load_seconds = time.perf_counter() - start
+
+    messages = sorted(set(m.lower() for m in guest_messages.generate(300, seed=5)))
+    start = time.perf_counter()
+    corrections = [sym_spell.lookup_compound(m, max_edit_distance=2)[0].term for m in messages]
+    lookup_ms = (time.perf_counter() - start) / len(messages) * 1000
+    loaded = memory()
+
+    # Pre-fork workers and measure what each one adds privately while serving lookups
+    read_fds = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        if os.fork() == 0:
+            os.close(read_fd)
+            before = memory()["private_mb"]
+            for message in messages:
+                sym_spell.lookup_compound(message, max_edit_distance=2)
+            after = memory()
+            os.write(write_fd, json.dumps({"added_private_mb": after["private_mb"] - before, "pss_mb": after["pss_mb"]}).encode())
+            os._exit(0)
+        os.close(write_fd)
+        read_fds.append(read_fd)
+    worker_stats = []
+    for read_fd in read_fds:
+        worker_stats.append(json.loads(os.read(read_fd, 4096)))
+        os.close(read_fd)
+    for _ in read_fds:
+        os.wait()
+
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "lookup_ms": lookup_ms,
+        "rss_mb": loaded["rss_mb"] - baseline["rss_mb"],
+        "private_mb": loaded["private_mb"] - baseline["private_mb"],
+        "worker_added_private_mb": sum(s["added_private_mb"] for s in worker_stats) / max(len(worker_stats), 1),
+        "worker_pss_mb": sum(s["pss_mb"] for s in worker_stats) / max(len(worker_stats), 1),
+        "corrections": corrections,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child")
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.workers)
+
+    from spell_index import build_index
+    start = time.perf_counter()
+    build_index(DICTIONARY)
+    print(f"Index build: {time.perf_counter() - start:.2f}s")
+
+    results = {}
+    for mode in ("text", "mmap"):
+        output = subprocess.run([sys.executable, __file__, "--child", mode, "--workers", str(args.workers)],
+                                capture_output=True, text=True, check=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+        r = results[mode]
+        print(f"{mode:<5} load={r['load_seconds']:6.3f}s  lookup={r['lookup_ms']:.3f} ms/msg  "
+              f"process +{r['rss_mb']:.0f} MB RSS ({r['private_mb']:.0f} MB private)  "
+              f"per forked worker: +{r['worker_added_private_mb']:.1f} MB private, PSS {r['worker_pss_mb']:.0f} MB")
+    assert results["text"]["corrections"] == results["mmap"]["corrections"], "mmap index changed corrections"
+    print("Corrections identical for both loaders")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Fuzz check and micro-benchmark for the streaming SSE decoder.
+
+The fuzz pass re-chunks stub-server streams at random byte boundaries
+(splitting events, coalescing several into one read, cutting through
+multi-byte UTF-8) and checks the decoded reply is always intact, both
+in-process and over HTTP through LlamaClient. The benchmark compares the
+decoder with the old one-event-per-chunk loop that concatenated strings.
+
+Usage:
+    python benchmarks/bench_sse.py --rounds 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import LlamaClient
+from sse import iter_completion_deltas
+from stub_llama_server import sse_events, start_stub_server
+
+REPLY = "Our rooftop pool is open 7am–10pm; the café serves crêpes ☕ until noon. " * 8
+
+
+def rechunk(data, rng, max_size=64):
+    pieces, start = [], 0
+    while start < len(data):
+        size = rng.randint(1, max_size)
+        pieces.append(data[start:start + size])
+        start += size
+    return pieces
+
+
+def legacy_decode(chunks):
+    """
+    The previous generate() loop: assumes one whole event per chunk.
+    """
+    full_response = ""
+    for chunk in chunks:
+        chunk_str = chunk.decode("utf-8", errors="replace")
+        if chunk_str.startswith("data:"):
+            try:
+                data = json.loads(chunk_str[5:].strip())
+                content = data["choices"][0]["delta"].get("content", "")
+                full_response += content
+            except json.JSONDecodeError:
+                continue
+    return full_response
+
+
+def fuzz(rounds, seed):
+    rng = random.Random(seed)
+    stream = b"".join(sse_events(REPLY))
+    legacy_failures = 0
+    for _ in range(rounds):
+        chunks = rechunk(stream, rng, max_size=rng.choice([1, 8, 64, 512]))
+        assert "".join(iter_completion_deltas(chunks)) == REPLY
+        legacy_failures += legacy_decode(chunks) != REPLY
+    return legacy_failures
+
+
+def fuzz_http(requests_count, seed):
+    server, base_url, _ = start_stub_server(reply=REPLY, chunking="random", seed=seed)
+    client = LlamaClient(base_url=base_url, api_key="stub")
+    try:
+        for _ in range(requests_count):
+            with client.stream([{"role": "user", "content": "pool hours?"}]) as response:
+                assert "".join(iter_completion_deltas(response.iter_content(chunk_size=None))) == REPLY
+    finally:
+        server.shutdown()
+
+
+def bench(fn, chunks, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(chunks)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    legacy_failures = fuzz(args.rounds, args.seed)
+    print(f"Fuzz: {args.rounds} random re-chunkings decoded intact "
+          f"(legacy loop garbled {legacy_failures}/{args.rounds})")
+    fuzz_http(50, args.seed)
+    print("Fuzz over HTTP: 50 randomly chunked stub streams decoded intact")
+
+    long_reply = "token " * 20000
+    events = sse_events(long_reply)
+    decoder_time = bench(lambda chunks: "".join(iter_completion_deltas(chunks)), events, 5)
+    legacy_time = bench(legacy_decode, events, 5)
+    tokens = len(events) - 1
+    print(f"Decoder: {tokens / decoder_time:,.0f} events/s  (legacy loop, one event per chunk: {tokens / legacy_time:,.0f} events/s)")
+
+
+if __name__ == "__main__":
+    main()
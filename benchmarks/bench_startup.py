@@ -0,0 +1,116 @@
+"""
+Benchmark: worker boot time and first-request latency.
+
+Each run is a fresh interpreter that imports the app and sends two /chat
+turns (answered by the local stub LLM server) to a seeded SQLite database.
+It reports the import time (including create_app) and the latency of the
+first and second request, for APP_WARM_UP=lazy, for APP_WARM_UP=preload,
+and for preload followed by a fork, the way gunicorn --preload serves
+requests from workers forked after the app was built.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+MESSAGES = ["what time is brekfast served", "do you allow pets in the rooms"]
+
+
+def seed():
+    from app import create_app
+    from models import db, User, Hotel, Room
+    from sqlalchemy import text
+
+    with create_app().app_context():
+        db.session.execute(text("CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(100), email VARCHAR(120), "
+                                "password VARCHAR(500), preferred_hotel_chain VARCHAR(100), loyalty_points INTEGER, "
+                                "created_at DATETIME, updated_at DATETIME)"))
+        db.session.commit()
+        db.metadata.create_all(db.engine, tables=[t for t in db.metadata.sorted_tables if t.name != "user"])
+        db.session.add(User(id=1, username="guest", email="g@x.io", password="x" * 10))
+        db.session.add(Hotel(id=1, name="Harbour View", location="Lisbon, Portugal", description="", amenities="Pool"))
+        db.session.add_all([Room(id=i, hotel_id=1, room_type="Double", description="", price_per_night=120 + i,
+                                 max_guests=2, amenities="WiFi") for i in range(1, 51)])
+        db.session.commit()
+
+
+def child(fork):
+    started = time.perf_counter()
+    from app import create_app
+    app = create_app()
+    import_ms = (time.perf_counter() - started) * 1000
+
+    if fork:
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid:
+            os.close(write_end)
+            with os.fdopen(read_end) as pipe:
+                result = json.loads(pipe.read())
+            os.waitpid(pid, 0)
+            print(json.dumps(dict(result, import_ms=import_ms)))
+            return
+        os.close(read_end)
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+    latencies = []
+    for message in MESSAGES:
+        started = time.perf_counter()
+        response = client.post("/chat", json={"message": message})
+        response.get_data()
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    result = {"import_ms": import_ms, "first_ms": latencies[0], "second_ms": latencies[1]}
+
+    if fork:
+        with os.fdopen(write_end, "w") as pipe:
+            pipe.write(json.dumps(result))
+        os._exit(0)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["seed", "run", "fork"])
+    args = parser.parse_args()
+    if args.child == "seed":
+        return seed()
+    if args.child:
+        return child(fork=args.child == "fork")
+
+    from stub_llama_server import start_stub_server
+
+    server, url, _ = start_stub_server()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/startup.db", LLAMA_API_BASE_URL=url,
+               SCHEDULER_MODE="worker", RESPONSE_CACHE="0", LOG_LEVEL="WARNING")
+    subprocess.run([sys.executable, __file__, "--child", "seed"], env=env, check=True, capture_output=True)
+
+    for label, warm_up, mode in (("lazy", "lazy", "run"), ("preload", "preload", "run"),
+                                 ("preload + fork", "preload", "fork")):
+        results = []
+        for _ in range(args.runs):
+            output = subprocess.run([sys.executable, __file__, "--child", mode], env=dict(env, APP_WARM_UP=warm_up),
+                                    check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        median = {key: statistics.median(result[key] for result in results) for key in results[0]}
+        print(f"{label:<15} import {median['import_ms']:7.1f} ms, first request {median['first_ms']:7.1f} ms, "
+              f"second request {median['second_ms']:6.1f} ms  (median of {args.runs})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Synthetic guest-message corpus shared by the NLP benchmarks.
+
+Messages follow a heavy-tailed distribution: a few phrasings ("check
+availability", "book a suite") dominate, with a long tail of templated
+messages carrying dates, budgets, typos and free-form questions.
+"""
+import random
+
+COMMON = [
+    "book a suite",
+    "check availability",
+    "I want to book a room",
+    "cancel my reservation",
+    "what time is breakfast",
+    "do you allow pets",
+    "what are the pool hours",
+    "is there free parking",
+    "change my reservation",
+    "can I get a late checkout",
+]
+
+TEMPLATES = [
+    "I want to book a {room} room from {d1} to {d2}",
+    "do you have a {room} available {d1} to {d2} for {n} guests",
+    "please reserve a {room} for {n} people under ${budget}",
+    "can I change my booking to a {room} starting {d1}",
+    "cancel the reservation for {d1} please",
+    "is the {room} room avialable next weekend",
+    "whats the price of a {room} for {n} nights",
+    "I need a quiet {room} with a view, budget ${budget} a night",
+    "check availabilty for {d1}",
+    "do you have a gym and a spa at the hotel in {city}",
+    "we are arriving late on {d1}, is that ok",
+    "modify my stay to {n} nights in a {room}",
+]
+
+ROOMS = ["single", "double", "suite", "deluxe", "king", "twin"]
+CITIES = ["New York", "Paris", "Lisbon", "Tokyo", "Cape Town"]
+
+
+def _date(rng):
+    return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def generate(count, seed=0, common_share=0.6):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        if rng.random() < common_share:
+            messages.append(rng.choice(COMMON))
+        else:
+            messages.append(rng.choice(TEMPLATES).format(
+                room=rng.choice(ROOMS), d1=_date(rng), d2=_date(rng), n=rng.randint(1, 6),
+                budget=rng.choice([90, 120, 150, 200, 300]), city=rng.choice(CITIES),
+            ))
+    return messages
+
+
+# Labeled phrasings for the intent benchmarks, including the ones that trip
+# the keyword rules ("check out", "change" without a reservation, ...)
+LABELED_TEMPLATES = {
+    "book_room": [
+        "I want to book a {room} room from {d1} to {d2}",
+        "please reserve a {room} for {n} people",
+        "can I get a {room} for {n} nights",
+        "we would like to stay in a {room} from {d1}",
+        "id like to make a reservation for {n} guests",
+        "book me a {room} in {city}",
+        "grab us a {room} starting {d1}",
+        "I'll take the {room}, please confirm it",
+    ],
+    "cancel_reservation": [
+        "cancel my reservation",
+        "cancel the booking for {d1} please",
+        "I can no longer come on {d1}, please drop my stay",
+        "we need to call off our trip to {city}",
+        "please void reservation for the {room}",
+        "I want a refund and to cancel",
+    ],
+    "modify_reservation": [
+        "change my reservation to {d1}",
+        "can I move my booking to {d2}",
+        "modify my stay to {n} nights in a {room}",
+        "switch my {room} to a {room2}",
+        "please extend my stay by {n} nights",
+        "update my booking to {n} guests",
+    ],
+    "check_availability": [
+        "check availability for {d1}",
+        "do you have a {room} available {d1} to {d2}",
+        "is the {room} room avialable next weekend",
+        "any free rooms in {city} on {d1}",
+        "are there vacancies from {d1} to {d2}",
+        "is anything open for {n} guests on {d1}",
+    ],
+    "general_inquiry": [
+        "what time is check out",
+        "can I get a late checkout",
+        "what time is breakfast",
+        "do you allow pets",
+        "is there free parking",
+        "what are the pool hours",
+        "how do I check in early",
+        "can I change towels daily",
+        "do you have a gym and a spa at the hotel in {city}",
+        "how far is the airport from the hotel",
+    ],
+}
+
+
+def generate_labeled(count, seed=0):
+    """
+    Return (message, intent) pairs drawn evenly across intents.
+    """
+    rng = random.Random(seed)
+    intents = sorted(LABELED_TEMPLATES)
+    pairs = []
+    for _ in range(count):
+        intent = rng.choice(intents)
+        message = rng.choice(LABELED_TEMPLATES[intent]).format(
+            room=rng.choice(ROOMS), room2=rng.choice(ROOMS), d1=_date(rng), d2=_date(rng),
+            n=rng.randint(1, 6), city=rng.choice(CITIES),
+        )
+        if rng.random() < 0.3:
+            message = message.capitalize() + rng.choice(["?", "!", ".", ""])
+        pairs.append((message, intent))
+    return pairs
@@ -0,0 +1,109 @@
+"""
+Stress harness: hammer /book_room from many threads and check for overlaps.
+
+Runs against a throwaway SQLite file by default; pass --database-url to point
+it at a migrated PostgreSQL database instead (rooms are seeded if missing).
+
+Usage:
+    python benchmarks/stress_book_room.py --threads 16 --requests 200 --rooms 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per thread")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--horizon-days", type=int, default=60)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/stress.db"
+    os.environ["DATABASE_URL"] = database_url
+
+    from sqlalchemy import insert, text
+    from app import create_app
+    from models import db, Hotel, Room, Reservation, RoomCalendar
+
+    app = create_app()
+
+    with app.app_context():
+        if database_url.startswith("sqlite"):
+            db.metadata.create_all(db.engine, tables=[
+                Hotel.__table__, Room.__table__, Reservation.__table__, RoomCalendar.__table__,
+            ])
+        if db.session.get(Hotel, 1) is None:
+            db.session.execute(insert(Hotel.__table__), [{
+                "id": 1, "name": "Stress Hotel", "location": "Nowhere", "description": "", "amenities": "",
+            }])
+        first_room = (db.session.query(db.func.max(Room.id)).scalar() or 0) + 1
+        room_ids = list(range(first_room, first_room + args.rooms))
+        db.session.execute(insert(Room.__table__), [{
+            "id": room_id, "hotel_id": 1, "room_type": "Double Room", "description": "",
+            "price_per_night": 150, "availability": True, "max_guests": 2, "amenities": "WiFi",
+        } for room_id in room_ids])
+        db.session.commit()
+
+    statuses = Counter()
+    lock = threading.Lock()
+    base = date.today() + timedelta(days=1)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = 1
+        local = Counter()
+        for _ in range(args.requests):
+            check_in = base + timedelta(days=rng.randrange(args.horizon_days))
+            check_out = check_in + timedelta(days=rng.randint(1, 5))
+            response = client.post("/book_room", json={
+                "room_id": rng.choice(room_ids),
+                "check_in_date": check_in.isoformat(),
+                "check_out_date": check_out.isoformat(),
+            })
+            local[response.status_code] += 1
+        with lock:
+            statuses.update(local)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        overlaps = db.session.execute(text("""
+            SELECT COUNT(*) FROM reservation a JOIN reservation b
+              ON a.room_id = b.room_id AND a.id < b.id
+             AND a.check_in_date < b.check_out_date AND b.check_in_date < a.check_out_date
+             AND COALESCE(a.status, '') != 'cancelled' AND COALESCE(b.status, '') != 'cancelled'
+            WHERE a.room_id BETWEEN :first AND :last
+        """), {"first": room_ids[0], "last": room_ids[-1]}).scalar()
+
+    total = sum(statuses.values())
+    print(f"Requests: {total} in {elapsed:.2f}s ({total / elapsed:.1f} req/s)")
+    print(f"Bookings: {statuses[200]} ({statuses[200] / elapsed:.1f} bookings/s)")
+    print(f"Status codes: {dict(sorted(statuses.items()))}")
+    print(f"Overlapping reservations: {overlaps}")
+    assert overlaps == 0, "double booking detected"
+
+
+if __name__ == "__main__":
+    main()
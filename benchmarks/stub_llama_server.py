@@ -0,0 +1,147 @@
+"""
+Local stub of the Llama /chat/completions endpoint.
+
+Answers both non-streaming and streaming ("stream": true) requests with a
+canned reply, keeps connections alive (HTTP/1.1, chunked transfer for
+streams), and can inject 429/5xx failures or split and coalesce SSE events
+across network writes to exercise client-side parsing.
+
+Usage:
+    python benchmarks/stub_llama_server.py --port 8089
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "Sure! We have a lovely suite available for those dates, with breakfast included."
+
+
+class StubConfig:
+    def __init__(self, reply=DEFAULT_REPLY, token_delay=0.0, fail_first=0, fail_status=503,
+                 chunking="event", seed=None):
+        self.reply = reply
+        self.token_delay = token_delay
+        self.fail_first = fail_first      # number of requests answered with fail_status
+        self.fail_status = fail_status
+        self.chunking = chunking          # "event", "random" (split/merge at random bytes) or "single"
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+
+def sse_events(reply):
+    """
+    The SSE byte stream for a streamed completion of ``reply``.
+    """
+    tokens = reply.split(" ")
+    events = []
+    for i, token in enumerate(tokens):
+        content = token if i == 0 else " " + token
+        chunk = {"choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]}
+        events.append(f"data: {json.dumps(chunk)}\n\n".encode())
+    events.append(b"data: [DONE]\n\n")
+    return events
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    config = None
+
+    def setup(self):
+        super().setup()
+        with self.config.lock:
+            self.config.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        config = self.config
+        with config.lock:
+            config.requests += 1
+            failing = config.requests <= config.fail_first
+
+        if self.path.rstrip("/") != "/chat/completions":
+            return self._send_json(404, {"error": "not found"})
+        if failing:
+            return self._send_json(config.fail_status, {"error": "injected failure"})
+
+        if not body.get("stream"):
+            return self._send_json(200, {
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": config.reply}, "finish_reason": "stop"}]
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in self._pieces(sse_events(config.reply)):
+            if config.token_delay:
+                time.sleep(config.token_delay)
+            self._write_chunk(piece)
+        self._write_chunk(b"")
+
+    def _pieces(self, events):
+        chunking = self.config.chunking
+        if chunking == "single":
+            return [b"".join(events)]
+        if chunking == "event":
+            return events
+        data = b"".join(events)
+        pieces, start = [], 0
+        while start < len(data):
+            size = self.config.rng.randint(1, 96)
+            pieces.append(data[start:start + size])
+            start += size
+        return pieces
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stub_server(port=0, **options):
+    """
+    Start the stub in a daemon thread; returns (server, base_url, config).
+    """
+    config = StubConfig(**options)
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--chunking", choices=["event", "random", "single"], default="event")
+    args = parser.parse_args()
+    server, url, _ = start_stub_server(args.port, token_delay=args.token_delay,
+                                       fail_first=args.fail_first, chunking=args.chunking)
+    print(f"Stub Llama API listening on {url} (set LLAMA_API_BASE_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import random
+import time
+
+from sqlalchemy import and_, tuple_, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import contains_eager
+
+from models import db, Room, Reservation
+from nlp_utils import calculate_total_price
+
+# Optimistic retries before a booking is reported as contended
+DEFAULT_MAX_RETRIES = 5
+# Base delay (seconds) for the jittered backoff between retries
+RETRY_BACKOFF = 0.01
+
+
+class BookingError(Exception):
+    """
+    Raised when a room cannot be booked.
+    """
+
+
+class BookingConflict(BookingError):
+    """
+    Raised when the requested dates overlap an existing reservation.
+    """
+
+
+class RoomBusy(BookingError):
+    """
+    Raised when concurrent bookings of the room won every optimistic retry;
+    the same request may succeed if sent again.
+    """
+
+
+def overlapping_reservation(room_id, check_in_date, check_out_date):
+    """
+    Return the first live reservation of the room overlapping [check_in, check_out), if any.
+    """
+    return Reservation.query.filter(
+        Reservation.room_id == room_id,
+        Reservation.status != "cancelled",
+        and_(Reservation.check_in_date < check_out_date, Reservation.check_out_date > check_in_date),
+    ).first()
+
+
+def book_room_safely(user_id, room_id, check_in_date, check_out_date, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Create a reservation while serializing conflicting bookings per room.
+
+    On PostgreSQL the room row is locked with SELECT ... FOR UPDATE for the
+    length of the transaction, so two requests for the same room queue up
+    while bookings for other rooms proceed in parallel. Other backends use
+    optimistic concurrency on Room.booking_version with bounded retries.
+    """
+    if check_out_date <= check_in_date:
+        raise BookingError("Check-out must be after check-in.")
+
+    if db.engine.dialect.name == "postgresql":
+        return _book_with_row_lock(user_id, room_id, check_in_date, check_out_date)
+    return _book_optimistically(user_id, room_id, check_in_date, check_out_date, max_retries)
+
+
+def _book_with_row_lock(user_id, room_id, check_in_date, check_out_date):
+    try:
+        room = db.session.query(Room).filter(Room.id == room_id).with_for_update().first()
+        reservation = _create_reservation(room, user_id, check_in_date, check_out_date)
+        db.session.commit()
+        return reservation
+    except IntegrityError as e:
+        # The exclusion constraint caught an overlap that slipped past the lock
+        db.session.rollback()
+        raise BookingConflict("Room not available for the selected dates.") from e
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _book_optimistically(user_id, room_id, check_in_date, check_out_date, max_retries):
+    for attempt in range(max_retries + 1):
+        try:
+            room = db.session.get(Room, room_id, populate_existing=True)
+            version = room.booking_version if room else None
+            reservation = _create_reservation(room, user_id, check_in_date, check_out_date)
+
+            # Claim the room: fails if another booking committed since we read it
+            claimed = db.session.execute(
+                update(Room)
+                .where(Room.id == room_id, Room.booking_version == version)
+                .values(booking_version=version + 1)
+            ).rowcount
+            if claimed == 1:
+                db.session.commit()
+                return reservation
+            db.session.rollback()
+        except OperationalError:
+            # SQLite reports writer contention as "database is locked"
+            db.session.rollback()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if attempt < max_retries:
+            time.sleep(RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    raise RoomBusy("Room is busy, please try again.")
+
+
+def _create_reservation(room, user_id, check_in_date, check_out_date):
+    if not room or not room.availability:
+        raise BookingError("Room not available.")
+    if overlapping_reservation(room.id, check_in_date, check_out_date):
+        raise BookingConflict("Room not available for the selected dates.")
+
+    reservation = Reservation(
+        user_id=user_id,
+        room_id=room.id,
+        check_in_date=check_in_date,
+        check_out_date=check_out_date,
+        total_price=calculate_total_price(room, check_in_date, check_out_date),
+    )
+    db.session.add(reservation)
+    db.session.flush()
+    return reservation
+
+
+def reservations_query(user_id, status=None, start=None, end=None, after=None):
+    """
+    Select a user's reservations by check-in date, with room and hotel
+    loaded by the same query.
+
+    ``status`` keeps one status, ``start``/``end`` keep stays overlapping
+    [start, end) and ``after`` is the (check_in_date, id) of the last
+    reservation of the previous page.
+    """
+    query = (db.session.query(Reservation)
+             .join(Reservation.room).join(Room.hotel)
+             .options(contains_eager(Reservation.room).contains_eager(Room.hotel))
+             .filter(Reservation.user_id == user_id))
+    if status:
+        query = query.filter(Reservation.status == status)
+    if start is not None:
+        query = query.filter(Reservation.check_out_date > start)
+    if end is not None:
+        query = query.filter(Reservation.check_in_date < end)
+    if after is not None:
+        # Row-value comparison so idx_reservation_user_check_in can seek to the cursor
+        query = query.filter(tuple_(Reservation.check_in_date, Reservation.id) > tuple_(*after))
+    return query.order_by(Reservation.check_in_date, Reservation.id)
+
+
+def _reservation_item(reservation):
+    room = reservation.room
+    return {
+        "id": reservation.id,
+        "room_id": room.id,
+        "room_type": room.room_type,
+        "hotel": room.hotel.name,
+        "location": room.hotel.location,
+        "check_in_date": reservation.check_in_date.strftime("%Y-%m-%d"),
+        "check_out_date": reservation.check_out_date.strftime("%Y-%m-%d"),
+        "total_price": reservation.total_price,
+        "status": reservation.status,
+    }
+
+
+def reservations_page(user_id, status=None, start=None, end=None, after=None, limit=None):
+    """
+    Return (reservations as plain dicts, cursor of the last one or None) in
+    one query. The cursor is set only when the page is full, i.e. when more
+    reservations may follow.
+    """
+    query = reservations_query(user_id, status, start, end, after)
+    reservations = query.limit(limit).all() if limit else query.all()
+    cursor = None
+    if limit and len(reservations) == limit:
+        cursor = (reservations[-1].check_in_date, reservations[-1].id)
+    return [_reservation_item(reservation) for reservation in reservations], cursor
+
+
+def user_reservations(user_id, status=None):
+    """
+    Return all of the user's reservations as plain dicts, in check-in order.
+    """
+    return reservations_page(user_id, status)[0]
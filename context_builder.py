@@ -0,0 +1,100 @@
+from models import db, Conversation, ConversationSummary
+
+# Upper bound on prompt tokens sent upstream per /chat turn
+DEFAULT_TOKEN_BUDGET = 1500
+# Most recent turns kept verbatim; older ones are folded into the running summary
+RECENT_TURNS = 6
+# Target size of the running summary
+SUMMARY_MAX_TOKENS = 300
+# Per-message framing overhead (role markers etc.) in chat-completion prompts
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text):
+    """
+    Cheap local token estimate for English chat text: about four tokens per
+    three words, but never less than one token per four characters (long
+    words and numbers split into several BPE tokens).
+    """
+    if not text:
+        return 0
+    return max(len(text.split()) * 4 // 3, len(text) // 4)
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def build_messages(system_message, user_input, turns, running_summary="", budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Assemble the chat-completion messages for one turn.
+
+    ``turns`` is a chronological list of (user message, bot response)
+    pairs. They are interleaved in order and, newest first, kept only while
+    the whole prompt fits in ``budget`` tokens. The running summary of older
+    turns rides along in the system message.
+    """
+    if running_summary:
+        system_message += f" Summary of the earlier conversation: {running_summary}"
+    system = {"role": "system", "content": system_message}
+    current = {"role": "user", "content": user_input}
+    used = message_tokens(system) + message_tokens(current)
+
+    history = []
+    for message, response in reversed(turns):
+        pair = [{"role": "assistant", "content": response}, {"role": "user", "content": message}]
+        cost = message_tokens(pair[0]) + message_tokens(pair[1])
+        if used + cost > budget:
+            break
+        history.extend(pair)
+        used += cost
+    history.reverse()
+
+    return [system] + history + [current]
+
+
+def load_context(user_id, limit=RECENT_TURNS):
+    """
+    Return (running summary, recent unfolded turns in chronological order) for a user.
+    """
+    state = db.session.get(ConversationSummary, user_id)
+    last_folded = state.last_conversation_id if state else 0
+    rows = Conversation.query.with_entities(Conversation.message, Conversation.response).filter(
+        Conversation.user_id == user_id,
+        Conversation.id > last_folded,
+    ).order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(limit).all()
+    turns = [(row.message, row.response) for row in reversed(rows)]
+    return (state.summary if state else ""), turns
+
+
+def fold_transcript(turns):
+    return "\n".join(f"User: {message}\nBot: {response}" for message, response in turns)
+
+
+def compact_history(user_id, summarize, keep=RECENT_TURNS):
+    """
+    Fold every turn older than the newest ``keep`` unfolded ones into the
+    user's running summary.
+
+    ``summarize(previous_summary, transcript)`` returns the updated summary;
+    only the newly folded turns are sent, never the whole history. Must run
+    inside an application context.
+    """
+    state = db.session.get(ConversationSummary, user_id)
+    last_folded = state.last_conversation_id if state else 0
+    rows = Conversation.query.with_entities(Conversation.id, Conversation.message, Conversation.response).filter(
+        Conversation.user_id == user_id,
+        Conversation.id > last_folded,
+    ).order_by(Conversation.created_at.asc(), Conversation.id.asc()).all()
+    if len(rows) <= keep:
+        return False
+
+    folded = rows[:-keep]
+    summary = summarize(state.summary if state else "", fold_transcript((row.message, row.response) for row in folded))
+    if state is None:
+        state = ConversationSummary(user_id=user_id)
+        db.session.add(state)
+    state.summary = summary
+    state.last_conversation_id = max(row.id for row in folded)
+    db.session.commit()
+    return True
@@ -0,0 +1,363 @@
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+from flask import has_app_context
+
+from models import Hotel
+
+# Checked in priority order when a message names several ("deluxe suite" -> suite)
+ROOM_TYPES = ["single", "double", "suite", "deluxe", "twin", "king", "queen"]
+# Seconds before hotel locations are re-read from the database
+DEFAULT_GAZETTEER_MAX_AGE = 600
+
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sept": 9, "sep": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6,
+}
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
+
+def _alternation(words):
+    # Longest first so "sept" wins over "sep"
+    return "|".join(sorted(words, key=len, reverse=True))
+
+
+_MONTH = _alternation(MONTHS)
+_NUMBER = r"\d{1,2}|" + _alternation(NUMBER_WORDS)
+_SUFFIX = r"(?:st|nd|rd|th)"
+# What a head count or stay length counts; "may 2 guests" is not a date
+_UNIT = r"guests?|people|persons?|pax|adults?|child(?:ren)?|kids?|infants?"
+_NOT_A_COUNT = rf"(?!\s+(?:{_UNIT}|nights?|weeks?|days?)\b)"
+# A bare ordinal is a date only after "the" or a preposition, and not
+# before a noun it counts ("on the 3rd floor")
+_ORDINAL_CONTEXT = "".join(
+    rf"(?<=\b{word} )|" for word in ("the", "on", "from", "to", "until", "till", "through", "by", "after", "before")
+).rstrip("|")
+_NOT_ORDINAL_NOUN = r"(?!\s+(?:floor|floors|time|times|night|day|week|guest|person|row|room|visit|stay|place|anniversary|birthday)\b)"
+
+# Every pattern below runs on the lowercased message (lowercasing once is
+# cheaper than re.IGNORECASE on each scan).
+#
+# One scan finds every date expression in order of appearance. Alternatives
+# are tried left to right at each position, so "12th of march" is read as a
+# day and month before the bare "12th" alternative gets a chance.
+DATE_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?P<iso>\d{4})-(?P<iso_month>\d{1,2})-(?P<iso_day>\d{1,2})"
+    r"|(?P<slash_a>\d{1,2})/(?P<slash_b>\d{1,2})/(?P<slash_year>\d{4}|\d{2})"
+    rf"|(?P<md_month>{_MONTH})\.?\s+(?P<md_day>\d{{1,2}}){_SUFFIX}?(?:,?\s+(?P<md_year>\d{{4}}))?\b{_NOT_A_COUNT}"
+    rf"|(?P<dm_day>\d{{1,2}}){_SUFFIX}?\s+(?:of\s+)?(?P<dm_month>{_MONTH})(?:,?\s+(?P<dm_year>\d{{4}}))?"
+    rf"|(?:{_ORDINAL_CONTEXT})(?P<ordinal>\d{{1,2}}){_SUFFIX}\b{_NOT_ORDINAL_NOUN}"
+    rf"|(?P<from_count>{_NUMBER})\s+(?P<from_unit>days?|weeks?)\s+from\s+(?P<from_base>today|tonight|tomorrow|now)"
+    r"|(?P<relative>the\s+day\s+after\s+tomorrow|today|tonight|tomorrow)"
+    rf"|in\s+(?P<in_count>{_NUMBER})\s+(?P<in_unit>days?|weeks?)"
+    r"|(?P<weekend_mod>this|next|coming)\s+weekend"
+    r"|next\s+week"
+    rf"|(?:(?P<weekday_mod>this|next|coming)\s+)?(?P<weekday>{_alternation(WEEKDAYS)})"
+    r")\b"
+)
+# "$150" as in suggest_rooms, plus "150 dollars" / "150 usd"
+_BUDGET = r"\$\s?(?P<price>\d+(?:\.\d+)?)|\b(?P<amount>\d+(?:\.\d+)?)\s?(?:dollars|usd|bucks)\b"
+# Stay length, head counts and budget share one scan
+QUANTITY_PATTERN = re.compile(
+    rf"{_BUDGET}"
+    rf"|\b(?:(?P<stay>{_NUMBER})\s+(?P<stay_unit>nights?|weeks?)"
+    rf"|party\s+of\s+(?P<party>{_NUMBER})"
+    rf"|(?P<count>{_NUMBER})\s+(?P<unit>{_UNIT}))\b"
+)
+BUDGET_PATTERN = re.compile(_BUDGET)
+# Phrases that say which end of the stay the following date belongs to
+STAY_END_PATTERN = re.compile(
+    r"\b(?:(?P<check_out>check(?:ing)?[\s-]?out|depart(?:ing|ure)?|leav(?:e|ing))"
+    r"|check(?:ing)?[\s-]?in|arriv(?:e|ing|al))\b"
+)
+ROOM_TYPE_PATTERN = re.compile(rf"\b({'|'.join(ROOM_TYPES)})s?\b")
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:['.][^\W\d_]+)*")
+
+
+def _number(token):
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(today, month, day, year=None):
+    # A month and day without a year means the next time that date comes round
+    if year is not None:
+        return _safe_date(year, month, day)
+    candidate = _safe_date(today.year, month, day)
+    if candidate is None or candidate < today:
+        candidate = _safe_date(today.year + 1, month, day)
+    return candidate
+
+
+def _upcoming_day_of_month(today, day):
+    # "the 12th": this month if it has not passed yet, otherwise the next month that has that day
+    year, month = today.year, today.month
+    for _ in range(13):
+        candidate = _safe_date(year, month, day)
+        if candidate is not None and candidate >= today:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return None
+
+
+def _resolve(match, today, anchor, day_first=False):
+    """
+    Turn one DATE_PATTERN match into a list of dates (a weekend gives two).
+    Dates without a year are the next occurrence after ``anchor``, the
+    previous date in the message (or today), so "12th of March to the
+    15th" stays in March. Slash dates are read day first when
+    ``day_first`` is set, month first otherwise.
+    """
+    groups = match.groupdict()
+    if groups["iso"]:
+        return [_safe_date(int(groups["iso"]), int(groups["iso_month"]), int(groups["iso_day"]))]
+    if groups["slash_a"]:
+        first, second = int(groups["slash_a"]), int(groups["slash_b"])
+        month, day = (second, first) if day_first else (first, second)
+        year = int(groups["slash_year"])
+        return [_safe_date(year + 2000 if year < 100 else year, month, day)]
+    if groups["md_month"]:
+        year = int(groups["md_year"]) if groups["md_year"] else None
+        return [_upcoming(anchor, MONTHS[groups["md_month"]], int(groups["md_day"]), year)]
+    if groups["dm_month"]:
+        year = int(groups["dm_year"]) if groups["dm_year"] else None
+        return [_upcoming(anchor, MONTHS[groups["dm_month"]], int(groups["dm_day"]), year)]
+    if groups["ordinal"]:
+        return [_upcoming_day_of_month(anchor, int(groups["ordinal"]))]
+    if groups["from_count"]:
+        # "a week from tomorrow"
+        days = _number(groups["from_count"]) * (7 if groups["from_unit"].startswith("week") else 1)
+        return [today + timedelta(days=days + (groups["from_base"] == "tomorrow"))]
+    if groups["relative"]:
+        relative = groups["relative"]
+        if relative.startswith("the"):
+            return [today + timedelta(days=2)]
+        return [today + timedelta(days=1 if relative == "tomorrow" else 0)]
+    if groups["in_count"]:
+        days = _number(groups["in_count"]) * (7 if groups["in_unit"].startswith("week") else 1)
+        return [today + timedelta(days=days)]
+    if groups["weekend_mod"]:
+        # Friday and Saturday nights, out on Sunday
+        modifier = groups["weekend_mod"]
+        if today.weekday() == 5 and modifier != "next":
+            return [today, today + timedelta(days=1)]
+        friday = today + timedelta(days=(4 - today.weekday()) % 7)
+        if modifier == "next" and friday - today < timedelta(days=2):
+            friday += timedelta(days=7)
+        return [friday, friday + timedelta(days=2)]
+    if groups["weekday"]:
+        # "friday" / "this friday" may be today; "next friday" is at least a day out
+        ahead = (WEEKDAYS[groups["weekday"]] - today.weekday()) % 7
+        if ahead == 0 and groups["weekday_mod"] == "next":
+            ahead = 7
+        return [today + timedelta(days=ahead)]
+    # "next week": the following Monday
+    return [today + timedelta(days=7 - today.weekday())]
+
+
+def _follows_check_out(lowered, position):
+    # True when the last check-in/check-out phrase before ``position`` is a check-out one
+    last = None
+    for match in STAY_END_PATTERN.finditer(lowered, 0, position):
+        last = match
+    return last is not None and last["check_out"] is not None
+
+
+class LocationGazetteer:
+    """
+    Word-level trie of hotel locations for longest-match lookup in free text.
+
+    Each Hotel.location ("New York, USA") contributes the whole string and
+    each comma-separated part, so "new york" and "USA" both match. Matching
+    is case-insensitive and returns the spelling stored in the database.
+    """
+
+    def __init__(self, locations=(), max_age=DEFAULT_GAZETTEER_MAX_AGE):
+        self.max_age = max_age
+        self._root = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        if locations:
+            self._root = self._build(locations)
+            self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def _build(locations):
+        root = {}
+        for location in locations:
+            names = [part.strip() for part in location.split(",")]
+            if len(names) > 1:
+                names.append(", ".join(names))
+            for name in names:
+                words = [word.lower() for word in WORD_PATTERN.findall(name)]
+                if not words:
+                    continue
+                node = root
+                for word in words:
+                    node = node.setdefault(word, {})
+                node.setdefault("", name)  # the first spelling seen wins
+        return root
+
+    def refresh(self):
+        locations = [row.location for row in Hotel.query.with_entities(Hotel.location).distinct() if row.location]
+        root = self._build(locations)
+        with self._lock:
+            self._root = root
+            self._loaded_at = time.monotonic()
+
+    def maybe_refresh(self):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at <= self.max_age:
+            return
+        if not has_app_context():
+            return
+        try:
+            self.refresh()
+        except Exception:
+            # Keep the previous gazetteer; try again later
+            self._loaded_at = time.monotonic()
+
+    def find(self, text):
+        """
+        Return the first (longest at that position) location mentioned in text, or None.
+        """
+        root = self._root
+        if not root:
+            return None
+        words = WORD_PATTERN.findall(text.lower())
+        for start in range(len(words)):
+            if words[start] not in root:
+                continue
+            node, found = root, None
+            for word in words[start:]:
+                node = node.get(word)
+                if node is None:
+                    break
+                found = node.get("", found)
+            if found is not None:
+                return found
+        return None
+
+
+class EntityExtractor:
+    """
+    Pull reservation details out of a raw (not yet lowercased) guest message.
+
+    Produces any of: check_in_date / check_out_date (ISO strings), nights,
+    guests, budget, room_type and location. Dates may be ISO, US-style
+    slashes, "March 12" / "12th of March", "the 12th", "today",
+    "tomorrow", "next Friday", "this weekend", "in 3 days", "a week from
+    tomorrow" or "next week";
+    a stay length ("3 nights", "a week") fills in the check-out date.
+    """
+
+    def __init__(self, gazetteer=None, today=date.today):
+        self.gazetteer = gazetteer if gazetteer is not None else LocationGazetteer()
+        self.today = today
+
+    def extract_dates(self, text, today=None):
+        return [day for _, days in self._dates_by_position(text.lower(), today) for day in days]
+
+    def _dates_by_position(self, lowered, today=None):
+        """
+        ((start, end), dates) for each date expression, in order of appearance.
+        """
+        today = today or self.today()
+        matches = list(DATE_PATTERN.finditer(lowered))
+        # One order for every slash date in the message: month first (US
+        # style) unless some date's first number cannot be a month
+        day_first = any(match["slash_a"] and int(match["slash_a"]) > 12 for match in matches)
+        found, anchor = [], today
+        for match in matches:
+            days = [day for day in _resolve(match, today, anchor, day_first) if day is not None]
+            if days:
+                found.append((match.span(), days))
+                anchor = days[-1]
+        return found
+
+    def extract(self, text, today=None):
+        entities = {}
+        if not text:
+            return entities
+        lowered = text.lower()
+
+        found = self._dates_by_position(lowered, today)
+        nights = budget = party = None
+        family = 0  # "2 adults and 1 child" adds up; otherwise the first head count wins
+        for match in QUANTITY_PATTERN.finditer(lowered):
+            if any(start < match.end() and match.start() < end for (start, end), _ in found):
+                continue  # part of a date: "in two weeks" is not a two-week stay
+            groups = match.groupdict()
+            if groups["stay"]:
+                if nights is None:
+                    nights = _number(groups["stay"]) * (7 if groups["stay_unit"].startswith("week") else 1)
+            elif groups["party"]:
+                party = party or _number(groups["party"])
+            elif groups["count"]:
+                if groups["unit"].startswith(("adult", "child", "kid", "infant")):
+                    family += _number(groups["count"])
+                elif party is None:
+                    party = _number(groups["count"])
+            elif budget is None:
+                budget = float(groups["price"] or groups["amount"])
+
+        if nights:
+            entities["nights"] = nights
+        dates = [day for _, days in found for day in days]
+        if len(dates) == 1 and _follows_check_out(lowered, found[0][0][0]):
+            # "late checkout on Sunday": the one date is the end of the stay
+            check_out = dates[0]
+            entities["check_out_date"] = check_out.isoformat()
+            if nights:
+                entities["check_in_date"] = (check_out - timedelta(days=nights)).isoformat()
+        elif dates:
+            check_in = dates[0]
+            entities["check_in_date"] = check_in.isoformat()
+            if len(dates) > 1 and dates[1] > check_in:
+                entities["check_out_date"] = dates[1].isoformat()
+            elif nights:
+                entities["check_out_date"] = (check_in + timedelta(days=nights)).isoformat()
+        guests = max(family, party or 0)
+        if guests:
+            entities["guests"] = guests
+        if budget is not None:
+            entities["budget"] = budget
+
+        room_types = set(ROOM_TYPE_PATTERN.findall(lowered))
+        for room_type in ROOM_TYPES:
+            if room_type in room_types:
+                entities["room_type"] = room_type
+                break
+
+        self.gazetteer.maybe_refresh()
+        location = self.gazetteer.find(lowered)
+        if location:
+            entities["location"] = location
+        return entities
+
+
+def extract_budget(text):
+    """
+    Return the first amount written as "$150" or "150 dollars", as a float.
+    """
+    match = BUDGET_PATTERN.search(text.lower())
+    if match is None:
+        return None
+    return float(match.group("price") or match.group("amount"))
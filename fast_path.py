@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+from booking import user_reservations
+from models import db, Hotel
+from nlp_utils import calculate_total_price, get_available_rooms
+
+logger = logging.getLogger(__name__)
+
+# Rooms listed in a local availability answer
+MAX_LISTED_ROOMS = 10
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def availability_answer(user_id, entities):
+    """
+    List free rooms and stay prices once both dates are known. Room type,
+    party size, budget and location narrow the list when the guest gave them.
+    """
+    if not (entities.get("check_in_date") and entities.get("check_out_date")):
+        return None
+    check_in, check_out = _parse_date(entities["check_in_date"]), _parse_date(entities["check_out_date"])
+    if check_out <= check_in:
+        return None
+
+    rooms = get_available_rooms(check_in, check_out)
+    wanted = []
+    if entities.get("room_type"):
+        rooms = [room for room in rooms if entities["room_type"] in room.room_type.lower()]
+        wanted.append(f"{entities['room_type']} ")
+    if entities.get("guests"):
+        rooms = [room for room in rooms if room.max_guests >= entities["guests"]]
+    if entities.get("budget") is not None:
+        rooms = [room for room in rooms if room.price_per_night <= entities["budget"]]
+    if entities.get("location"):
+        hotel_ids = {row.id for row in Hotel.query.with_entities(Hotel.id).filter(
+            Hotel.location.ilike(f"%{entities['location']}%"))}
+        rooms = [room for room in rooms if room.hotel_id in hotel_ids]
+
+    nights = (check_out - check_in).days
+    stay = f"from {entities['check_in_date']} to {entities['check_out_date']} ({nights} night{'s' if nights != 1 else ''})"
+    if entities.get("guests"):
+        stay += f" for {entities['guests']} guest{'s' if entities['guests'] != 1 else ''}"
+    if entities.get("location"):
+        stay += f" in {entities['location']}"
+    if not rooms:
+        return f"Sorry, no {''.join(wanted)}rooms are available {stay}. Would you like to try other dates?"
+
+    rooms.sort(key=lambda room: room.price_per_night)
+    lines = [f"Here are the {''.join(wanted)}rooms available {stay}:"]
+    for room in rooms[:MAX_LISTED_ROOMS]:
+        total = calculate_total_price(room, check_in, check_out)
+        lines.append(f"- {room.room_type}: ${room.price_per_night:.0f}/night, ${total:.0f} total (room {room.id})")
+    if len(rooms) > MAX_LISTED_ROOMS:
+        lines.append(f"...and {len(rooms) - MAX_LISTED_ROOMS} more.")
+    lines.append("Tell me which room you would like to book.")
+    return "\n".join(lines)
+
+
+def reservations_answer(user_id, entities):
+    """
+    List the guest's reservations (the data behind /view_reservations).
+    """
+    reservations = user_reservations(user_id)
+    if not reservations:
+        return "You don't have any reservations yet. Would you like to check availability?"
+    lines = ["Here are your reservations:"]
+    for reservation in reservations:
+        lines.append(
+            f"- #{reservation['id']} {reservation['room_type']}, {reservation['check_in_date']} to "
+            f"{reservation['check_out_date']}, ${reservation['total_price']:.0f} ({reservation['status']})"
+        )
+    return "\n".join(lines)
+
+
+class FastPathRouter:
+    """
+    Answers fully structured chat turns from the database instead of the LLM.
+
+    Handlers are registered per intent and return the reply text, or None
+    when the turn is missing something and should go to the LLM. A handler
+    that raises also falls through, so the fast path can only ever save
+    work. Counters record how many turns were served locally and how long
+    they took.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._handlers = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {"turns": 0, "local": 0, "errors": 0, "total_local_ms": 0.0, "max_local_ms": 0.0}
+        self._by_intent = {}
+
+    def register(self, intent, handler):
+        self._handlers[intent] = handler
+
+    def answer(self, user_id, intent, entities):
+        handler = self._handlers.get(intent) if self.enabled else None
+        reply = None
+        started = time.perf_counter()
+        if handler is not None:
+            try:
+                reply = handler(user_id, entities)
+            except Exception as e:
+                # Leave the session usable for the rest of the request (on
+                # PostgreSQL a failed statement aborts the transaction)
+                db.session.rollback()
+                logger.error("Fast path for %s failed, falling back to the LLM: %s", intent, e)
+                self._bump("errors")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._stats_lock:
+            self._stats["turns"] += 1
+            if reply is not None:
+                self._stats["local"] += 1
+                self._stats["total_local_ms"] += elapsed_ms
+                self._stats["max_local_ms"] = max(self._stats["max_local_ms"], elapsed_ms)
+                self._by_intent[intent] = self._by_intent.get(intent, 0) + 1
+        return reply
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["local_by_intent"] = dict(self._by_intent)
+        stats["llm"] = stats["turns"] - stats["local"]
+        stats["local_fraction"] = stats["local"] / stats["turns"] if stats["turns"] else 0.0
+        stats["avg_local_ms"] = stats["total_local_ms"] / stats["local"] if stats["local"] else 0.0
+        return stats
+
+    def _bump(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
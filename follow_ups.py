@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select, text, update
+
+from models import db, FollowUp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+# Batches claimed per tick at most, so one tick cannot run unbounded
+DEFAULT_MAX_BATCHES = 20
+# Seconds a claimed follow-up may stay "sending" before another worker takes it over
+DEFAULT_LEASE = 300
+
+SCHEDULED, SENDING, SENT, FAILED = "scheduled", "sending", "sent", "failed"
+
+# First key of the per-user PostgreSQL advisory locks taken while claiming
+# (the second is the user id); int4, as the two-key form requires
+USER_LOCK_NAMESPACE = zlib.crc32(b"hotel-chatbot-follow-ups") & 0x7FFFFFFF
+
+DEFAULT_MESSAGE = "Just checking in! Do you need help with anything else for your upcoming reservation?"
+
+
+def _now():
+    # Naive UTC, like the other DateTime columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def schedule_follow_up(user_id, scheduled_at, message=DEFAULT_MESSAGE):
+    """
+    Queue a follow-up message for a user. The caller commits.
+    """
+    follow_up = FollowUp(user_id=user_id, message=message, scheduled_at=scheduled_at, status=SCHEDULED)
+    db.session.add(follow_up)
+    return follow_up
+
+
+def bulk_schedule(rows):
+    """
+    Insert many {"user_id", "scheduled_at"[, "message"]} follow-ups in one statement. The caller commits.
+    """
+    db.session.execute(insert(FollowUp), [dict({"message": DEFAULT_MESSAGE}, **row, status=SCHEDULED) for row in rows])
+
+
+class FollowUpDispatcher:
+    """
+    Sends due FollowUp rows in batches; safe to run in several workers.
+
+    A batch is claimed per user: the users behind the ``batch_size``
+    oldest due rows are read, and one UPDATE ... RETURNING moves all of
+    their due rows from "scheduled" to "sending", so a user with several
+    due rows gets one delivery carrying every message. On PostgreSQL each
+    user is first locked with pg_try_advisory_xact_lock, held until the
+    claim commits; users another worker is claiming are skipped, so no
+    two workers ever split one user's rows. Elsewhere the status check in
+    the UPDATE keeps claims exclusive. Outcomes are written back
+    with one UPDATE per status. Rows left "sending" by a worker that died
+    are rescheduled after ``lease`` seconds.
+
+    ``deliver`` receives {user_id: [message, ...]} and returns the user ids
+    it could not reach (or raises, failing the whole batch).
+    """
+
+    def __init__(self, deliver, app=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=DEFAULT_MAX_BATCHES,
+                 lease=DEFAULT_LEASE):
+        self.app = app
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._stats = {
+            "ticks": 0, "batches": 0, "claimed": 0, "sent": 0, "failed": 0, "deliveries": 0, "reclaimed": 0,
+            "last_tick_ms": 0.0,
+        }
+
+    def init_app(self, app):
+        self.app = app
+
+    def tick(self):
+        """
+        Scheduler entry point: reclaim expired leases, then drain due rows
+        until none are left or ``max_batches`` have been sent.
+        """
+        started = time.perf_counter()
+        with self.app.app_context():
+            reclaimed = self.reclaim_expired()
+            batches = 0
+            while batches < self.max_batches and self.dispatch_batch():
+                batches += 1
+        with self._lock:
+            self._stats["ticks"] += 1
+            self._stats["reclaimed"] += reclaimed
+            self._stats["last_tick_ms"] = (time.perf_counter() - started) * 1000
+
+    def dispatch_batch(self, now=None):
+        """
+        Claim, deliver and settle one batch. Returns the number of rows claimed.
+        """
+        now = now or _now()
+        claimed = self.claim(now)
+        if not claimed:
+            return 0
+
+        by_user = {}
+        for row in claimed:
+            by_user.setdefault(row.user_id, []).append(row)
+        try:
+            failed_users = set(self.deliver({user_id: _unique_messages(rows) for user_id, rows in by_user.items()}) or ())
+        except Exception as e:
+            logger.error("Follow-up delivery of %d rows failed: %s", len(claimed), e)
+            failed_users = set(by_user)
+
+        sent_ids = [row.id for user_id, rows in by_user.items() if user_id not in failed_users for row in rows]
+        failed_ids = [row.id for user_id in failed_users for row in by_user.get(user_id, ())]
+        self._settle(sent_ids, failed_ids, _now())
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["claimed"] += len(claimed)
+            self._stats["sent"] += len(sent_ids)
+            self._stats["failed"] += len(failed_ids)
+            self._stats["deliveries"] += len(by_user) - len(failed_users & set(by_user))
+        return len(claimed)
+
+    def claim(self, now):
+        """
+        Atomically mark the due rows of up to batch_size users as "sending"
+        and return their (id, user_id, message) rows.
+        """
+        is_due = (FollowUp.status == SCHEDULED, FollowUp.scheduled_at <= now)
+        try:
+            # The users of the batch_size oldest due rows, then all of those users' due rows,
+            # so each user is delivered to once rather than once per batch
+            user_ids = list(dict.fromkeys(db.session.scalars(
+                select(FollowUp.user_id).where(*is_due).order_by(FollowUp.scheduled_at).limit(self.batch_size)
+            )))
+            if user_ids and db.engine.dialect.name == "postgresql":
+                user_ids = db.session.scalars(
+                    text("SELECT user_id FROM unnest(:user_ids) AS user_id "
+                         "WHERE pg_try_advisory_xact_lock(:namespace, user_id)"),
+                    {"user_ids": user_ids, "namespace": USER_LOCK_NAMESPACE},
+                ).all()
+            if not user_ids:
+                db.session.commit()
+                return []
+            rows = db.session.execute(
+                update(FollowUp)
+                .where(*is_due, FollowUp.user_id.in_(user_ids))
+                # sent_at holds the claim time while the row is "sending"
+                .values(status=SENDING, sent_at=now)
+                .returning(FollowUp.id, FollowUp.user_id, FollowUp.message)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.session.commit()
+            return rows
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def reclaim_expired(self, now=None):
+        """
+        Put rows whose claim is older than the lease back to "scheduled". Returns how many.
+        """
+        cutoff = (now or _now()) - timedelta(seconds=self.lease)
+        try:
+            result = db.session.execute(
+                update(FollowUp)
+                .where(FollowUp.status == SENDING, FollowUp.sent_at < cutoff)
+                .values(status=SCHEDULED, sent_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if result.rowcount:
+            logger.warning("Rescheduled %d follow-ups whose worker did not finish them", result.rowcount)
+        return result.rowcount
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _settle(self, sent_ids, failed_ids, now):
+        try:
+            for ids, values in ((sent_ids, {"status": SENT, "sent_at": now}), (failed_ids, {"status": FAILED, "sent_at": None})):
+                if ids:
+                    db.session.execute(update(FollowUp).where(FollowUp.id.in_(ids)).values(**values)
+                                       .execution_options(synchronize_session=False))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def _unique_messages(rows):
+    return list(dict.fromkeys(row.message for row in rows))
+
@@ -0,0 +1,116 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, func, select, tuple_
+
+from models import db, Conversation
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+# Rows fetched per round trip from the server-side cursor
+STREAM_BATCH_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised for a cursor that was not produced by encode_cursor.
+    """
+
+
+def encode_cursor(created_at, conversation_id):
+    raw = f"{created_at.isoformat()}|{conversation_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, conversation_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(conversation_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def _page_filter(user_id, before):
+    # Keyset on (created_at, id), newest first; served by idx_conversation_user_created
+    condition = Conversation.user_id == user_id
+    if before is not None:
+        created_at, conversation_id = before
+        # Row-value comparison so the planner can seek the composite index
+        condition = and_(condition, tuple_(Conversation.created_at, Conversation.id) < tuple_(created_at, conversation_id))
+    return condition
+
+
+def page_query(user_id, before=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Select one page of a user's turns, newest first. ``limit=None`` selects the whole remaining history.
+    """
+    query = (select(Conversation.id, Conversation.message, Conversation.response, Conversation.created_at)
+             .where(_page_filter(user_id, before))
+             .order_by(Conversation.created_at.desc(), Conversation.id.desc()))
+    return query.limit(limit) if limit else query
+
+
+def page_etag(user_id, before=None, limit=DEFAULT_PAGE_SIZE, variant=""):
+    """
+    Validator for a page: changes whenever a turn on the page is added, removed or edited.
+    """
+    page = (select(Conversation.id, Conversation.updated_at)
+            .where(_page_filter(user_id, before))
+            .order_by(Conversation.created_at.desc(), Conversation.id.desc()))
+    if limit:
+        page = page.limit(limit)
+    page = page.subquery()
+    count, newest_id, last_update = db.session.execute(
+        select(func.count(), func.max(page.c.id), func.max(page.c.updated_at))
+    ).one()
+    digest = hashlib.sha1(f"{user_id}|{before}|{limit}|{variant}|{count}|{newest_id}|{last_update}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _item(row):
+    return {
+        "id": row.id,
+        "message": row.message,
+        "response": row.response,
+        "date": row.created_at.strftime("%Y-%m-%d %H:%M:%S") if row.created_at else None,
+    }
+
+
+def _rows(user_id, before, limit):
+    # yield_per streams from a server-side cursor where the driver supports it,
+    # so memory stays flat however long the history is
+    result = db.session.execute(page_query(user_id, before, limit).execution_options(yield_per=STREAM_BATCH_SIZE))
+    for row in result:
+        yield row
+
+
+def _next_cursor(last, emitted, limit):
+    if last is None or not limit or emitted < limit:
+        return None
+    return encode_cursor(last.created_at, last.id)
+
+
+def iter_ndjson(user_id, before=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One JSON object per line and turn, then a final {"next_cursor": ...} line.
+    """
+    last, emitted = None, 0
+    for row in _rows(user_id, before, limit):
+        yield json.dumps(_item(row)) + "\n"
+        last, emitted = row, emitted + 1
+    yield json.dumps({"next_cursor": _next_cursor(last, emitted, limit)}) + "\n"
+
+
+def iter_json(user_id, before=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    {"conversation_history": [...], "next_cursor": ...} written incrementally.
+    """
+    yield '{"conversation_history": ['
+    last, emitted = None, 0
+    for row in _rows(user_id, before, limit):
+        yield ("," if emitted else "") + json.dumps(_item(row))
+        last, emitted = row, emitted + 1
+    yield f'], "next_cursor": {json.dumps(_next_cursor(last, emitted, limit))}}}'
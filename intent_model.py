@@ -0,0 +1,220 @@
+import csv
+import json
+import math
+import os
+import re
+import sys
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_FEATURES = 2 ** 16
+DEFAULT_EPOCHS = 12
+DEFAULT_LEARNING_RATE = 0.5
+DEFAULT_L2 = 1e-5
+DEFAULT_BATCH_SIZE = 256
+# Predictions below this softmax probability are left to the keyword rules
+DEFAULT_MIN_CONFIDENCE = 0.5
+
+FORMAT_VERSION = 1
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def normalize(text):
+    # Numbers only contribute their length, so dates, prices and guest
+    # counts generalise instead of each value being its own feature
+    return [f"<{len(word)}d>" if word.isdigit() else word for word in WORD_PATTERN.findall(text.lower())]
+
+
+def _hash(feature, mask):
+    return zlib.crc32(feature.encode("utf-8")) & mask
+
+
+@lru_cache(maxsize=65536)
+def _word_features(word, mask):
+    # The word itself plus its character trigrams, so typos such as
+    # "avialable" still share most features with the correct spelling
+    features = [_hash("w:" + word, mask)]
+    if not word.startswith("<"):
+        padded = f"<{word}>"
+        features.extend(_hash("c:" + padded[i:i + 3], mask) for i in range(len(padded) - 2))
+    return tuple(features)
+
+
+@lru_cache(maxsize=65536)
+def _bigram_feature(first, second, mask):
+    return _hash(f"b:{first} {second}", mask)
+
+
+class IntentClassifier:
+    """
+    Hashed n-gram features with a multinomial logistic regression on top.
+
+    A message becomes word unigrams, word bigrams and per-word character
+    trigrams, each hashed (crc32) into ``n_features`` buckets with L2
+    normalised binary weights. Scores are a sum of rows of the weight
+    matrix, so classifying a message costs a few dozen array lookups and
+    needs nothing beyond NumPy. The whole model is one ``.npz`` file.
+    """
+
+    def __init__(self, labels, weights):
+        self.labels = list(labels)
+        self.weights = weights  # float32, n_features x len(labels)
+        self.n_features = weights.shape[0]
+        self._mask = self.n_features - 1
+
+    def features(self, text):
+        mask = self._mask
+        words = normalize(text)
+        indices = [_hash("<s>", mask)]  # always present, acts as the bias
+        for word in words:
+            indices.extend(_word_features(word, mask))
+        indices.extend(_bigram_feature(a, b, mask) for a, b in zip(words, words[1:]))
+        return indices
+
+    def _vectorize(self, texts):
+        indices, offsets = [], []
+        for text in texts:
+            offsets.append(len(indices))
+            indices.extend(self.features(text))
+        offsets.append(len(indices))
+        indices = np.asarray(indices, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        counts = np.diff(offsets)
+        values = np.repeat((1.0 / np.sqrt(counts)).astype(np.float32), counts)
+        return indices, offsets, values
+
+    def _scores(self, indices, offsets, values):
+        # Every row has at least the "<s>" feature, so reduceat never sees an empty slice
+        return np.add.reduceat(self.weights[indices] * values[:, None], offsets[:-1], axis=0)
+
+    def predict_proba(self, texts):
+        scores = self._scores(*self._vectorize(texts))
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, texts):
+        """
+        Return a list of (intent, probability) pairs, one per text.
+        """
+        if not texts:
+            return []
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[i], float(p)) for i, p in zip(best, probabilities[np.arange(len(best)), best])]
+
+    def predict_one(self, text):
+        indices = self.features(text)
+        scores = self.weights.take(indices, axis=0).sum(axis=0).tolist()
+        best = max(range(len(scores)), key=scores.__getitem__)
+        # Softmax probability of the winning class, in plain floats: for a
+        # handful of classes this is cheaper than more NumPy calls
+        scale = 1.0 / math.sqrt(len(indices))
+        top = scores[best]
+        return self.labels[best], 1.0 / sum(math.exp((score - top) * scale) for score in scores)
+
+    @classmethod
+    def train(cls, texts, intents, n_features=DEFAULT_FEATURES, epochs=DEFAULT_EPOCHS,
+              learning_rate=DEFAULT_LEARNING_RATE, l2=DEFAULT_L2, batch_size=DEFAULT_BATCH_SIZE, seed=0):
+        """
+        Fit the weights with mini-batch AdaGrad on the softmax cross-entropy.
+        """
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        labels = sorted(set(intents))
+        label_ids = {label: i for i, label in enumerate(labels)}
+        targets = np.array([label_ids[intent] for intent in intents], dtype=np.int64)
+        model = cls(labels, np.zeros((n_features, len(labels)), dtype=np.float32))
+
+        indices, offsets, values = model._vectorize(texts)
+        rng = np.random.default_rng(seed)
+        squared = np.full_like(model.weights, 1e-8)
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                starts, ends = offsets[rows], offsets[rows + 1]
+                counts = ends - starts
+                positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+                batch_indices, batch_values = indices[positions], values[positions]
+                batch_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+                probabilities = model._scores(batch_indices, batch_offsets, batch_values)
+                probabilities -= probabilities.max(axis=1, keepdims=True)
+                np.exp(probabilities, out=probabilities)
+                probabilities /= probabilities.sum(axis=1, keepdims=True)
+                probabilities[np.arange(len(rows)), targets[rows]] -= 1.0
+                probabilities /= len(rows)
+
+                touched, inverse = np.unique(batch_indices, return_inverse=True)
+                gradient = np.zeros((len(touched), len(labels)), dtype=np.float32)
+                np.add.at(gradient, inverse, np.repeat(probabilities, counts, axis=0) * batch_values[:, None])
+                gradient += l2 * model.weights[touched]
+                squared[touched] += gradient ** 2
+                model.weights[touched] -= learning_rate * gradient / np.sqrt(squared[touched])
+        return model
+
+    def save(self, path):
+        # Per-process temporary name: workers may train on first use at once
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, version=np.array(FORMAT_VERSION), labels=np.array(self.labels), weights=self.weights)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as artifact:
+            if int(artifact["version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported intent model version in {path}")
+            return cls(artifact["labels"].tolist(), artifact["weights"])
+
+
+def load_examples(path):
+    """
+    Read labeled messages from a Conversation export: JSON lines or CSV
+    with "message" and "intent" fields. Rows without an intent are skipped.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    examples = [(row["message"], row["intent"]) for row in rows if row.get("message") and row.get("intent")]
+    return [message for message, _ in examples], [intent for _, intent in examples]
+
+
+def load_intent_classifier(model_path, examples_path=None, build=True):
+    """
+    Return the classifier saved at model_path. When it is missing or older
+    than examples_path, it is trained from the examples first and saved
+    (``build=True``); a read-only deployment keeps the freshly trained model
+    in memory. Returns None when there is neither an artifact nor examples.
+    """
+    have_examples = examples_path is not None and os.path.exists(examples_path)
+    fresh = os.path.exists(model_path) and (
+        not have_examples or os.path.getmtime(model_path) >= os.path.getmtime(examples_path))
+    if fresh:
+        return IntentClassifier.load(model_path)
+    if not (build and have_examples):
+        return IntentClassifier.load(model_path) if os.path.exists(model_path) else None
+
+    model = IntentClassifier.train(*load_examples(examples_path))
+    try:
+        model.save(model_path)
+    except OSError:
+        pass  # read-only deployment: serve the in-memory model
+    return model
+
+
+if __name__ == "__main__":
+    # Training step: python intent_model.py [labeled_export.jsonl] [intent_model.npz]
+    # Defaults to the labeled examples shipped next to this module.
+    here = os.path.dirname(os.path.abspath(__file__))
+    examples = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "intent_examples.jsonl")
+    output = sys.argv[2] if len(sys.argv) > 2 else os.path.join(here, "intent_model.npz")
+    texts, intents = load_examples(examples)
+    IntentClassifier.train(texts, intents).save(output)
+    print(f"Trained on {len(texts)} messages, wrote {output}")
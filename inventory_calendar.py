@@ -0,0 +1,353 @@
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from availability import to_night
+from models import db, Room, Reservation, RoomCalendar
+
+logger = logging.getLogger(__name__)
+
+# Number of nights, starting today, mirrored by the calendar
+DEFAULT_HORIZON = 365
+# Seconds before the in-memory mirror is reloaded from the persisted table
+DEFAULT_MAX_AGE = 60
+
+
+class InventoryCalendar:
+    """
+    Per-room, per-night occupancy matrix.
+
+    Rows are rooms, columns are nights starting at ``start``. Each cell holds
+    the number of live reservations covering that night. A room is free for a stay when every night in the range is zero, which is a
+    single vectorized reduction over a slice of the matrix.
+
+    The room_calendar table is rewritten only by ``rollover`` (the leader's
+    nightly job) and the rebuild-calendar command. Workers load it, and
+    after a booking or cancellation rewrite that one room's row from its
+    reservations (``refresh_room``).
+    """
+
+    def __init__(self, horizon=DEFAULT_HORIZON, max_age=DEFAULT_MAX_AGE, app=None):
+        self.app = app
+        self.horizon = horizon
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self.start = None
+        self._room_ids = np.empty(0, dtype=np.int64)
+        self._rows = {}
+        self._bookable = np.empty(0, dtype=bool)
+        self._counts = np.zeros((0, horizon), dtype=np.int16)
+        self._loaded_at = None
+
+    # ------------------------------------------------------------------
+    # Bulk build
+    # ------------------------------------------------------------------
+    def build(self, rooms, reservations, start=None):
+        """
+        Rebuild the matrix from (room_id, bookable) pairs and
+        (room_id, check_in, check_out) tuples.
+        """
+        start = start or date.today()
+        first = start.toordinal()
+
+        rooms = sorted(rooms)
+        room_ids = np.fromiter((room_id for room_id, _ in rooms), dtype=np.int64, count=len(rooms))
+        bookable = np.fromiter((bool(flag) for _, flag in rooms), dtype=bool, count=len(rooms))
+        rows = {int(room_id): row for row, room_id in enumerate(room_ids)}
+        counts = _count_nights(rows, reservations, first, self.horizon)
+
+        with self._lock:
+            self.start = start
+            self._room_ids = room_ids
+            self._rows = rows
+            self._bookable = bookable
+            self._counts = counts
+            self._loaded_at = time.monotonic()
+
+    def init_app(self, app):
+        self.app = app
+
+    def rollover(self):
+        """
+        Scheduler entry point (leader only): rebuild today's calendar and persist it.
+        """
+        with self.app.app_context():
+            self.rebuild_from_reservations()
+        logger.info("Inventory calendar rebuilt for %d nights from %s", self.horizon, self.start)
+
+    def rebuild_from_reservations(self, start=None, persist=True):
+        """
+        Rebuild from the Room and Reservation tables and, unless ``persist``
+        is false, write the result to room_calendar. Must be called inside
+        an application context.
+        """
+        start = start or date.today()
+        try:
+            if persist:
+                # Lock every persisted row before reading reservations: a
+                # refresh_room racing this rebuild either committed before the
+                # read, or waits and rewrites its room on top of the result
+                db.session.execute(select(RoomCalendar.room_id).with_for_update()).all()
+            rooms = Room.query.with_entities(Room.id, Room.availability)
+            reservations = _live_reservations(start, start + timedelta(days=self.horizon))
+            self.build([(room.id, room.availability) for room in rooms], reservations, start=start)
+            if persist:
+                self.persist()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def persist(self):
+        """
+        Write the occupancy bitmap of every room to the room_calendar table.
+        Rows are updated in place, so concurrent refresh_room calls never
+        find their room's row missing. A row that a refresh_room inserted
+        meanwhile for a new room is left as it is: it was counted later.
+        """
+        with self._lock:
+            packed = np.packbits(self._counts > 0, axis=1)
+            now = datetime.now(timezone.utc)
+            rows = [{
+                "room_id": int(room_id),
+                "start_date": self.start,
+                "nights": self.horizon,
+                "occupancy": packed[row].tobytes(),
+                "updated_at": now,
+            } for row, room_id in enumerate(self._room_ids)]
+        stored = set(db.session.scalars(select(RoomCalendar.room_id)))
+        current = {row["room_id"] for row in rows}
+        if stored - current:
+            db.session.execute(delete(RoomCalendar).where(RoomCalendar.room_id.in_(stored - current)))
+        if stored & current:
+            db.session.execute(update(RoomCalendar), [row for row in rows if row["room_id"] in stored])
+        if current - stored:
+            db.session.execute(_insert_missing(), [row for row in rows if row["room_id"] not in stored])
+        db.session.commit()
+
+    def load_persisted(self):
+        """
+        Load the matrix from room_calendar. Returns False when no persisted
+        row was built for today and this horizon. Rooms without such a row
+        (added since the last rebuild, say) are counted from their
+        reservations instead, so one new room does not discard the rest.
+        """
+        start = date.today()
+        stored = [entry for entry in RoomCalendar.query.all()
+                  if entry.start_date == start and entry.nights == self.horizon]
+        if not stored:
+            return False
+        rooms = Room.query.with_entities(Room.id, Room.availability).all()
+
+        room_ids = np.array(sorted(room.id for room in rooms), dtype=np.int64)
+        rows = {int(room_id): row for row, room_id in enumerate(room_ids)}
+        bookable = np.zeros(len(room_ids), dtype=bool)
+        for room in rooms:
+            bookable[rows[room.id]] = bool(room.availability)
+        counts = np.zeros((len(room_ids), self.horizon), dtype=np.int16)
+        loaded = set()
+        for entry in stored:
+            row = rows.get(entry.room_id)
+            if row is None:
+                continue  # room deleted since
+            bits = np.unpackbits(np.frombuffer(entry.occupancy, dtype=np.uint8))[:self.horizon]
+            counts[row] = bits
+            loaded.add(entry.room_id)
+        missing = [room_id for room_id in rows if room_id not in loaded]
+        if missing:
+            reservations = _live_reservations(start, start + timedelta(days=self.horizon)).filter(
+                Reservation.room_id.in_(missing))
+            missing_rows = {room_id: i for i, room_id in enumerate(missing)}
+            recounted = _count_nights(missing_rows, reservations, start.toordinal(), self.horizon)
+            counts[[rows[room_id] for room_id in missing]] = recounted
+
+        with self._lock:
+            self.start = start
+            self._room_ids = room_ids
+            self._rows = rows
+            self._bookable = bookable
+            self._counts = counts
+            self._loaded_at = time.monotonic()
+        return True
+
+    def ensure_fresh(self):
+        """
+        Load the calendar on first use and reload it from room_calendar once
+        it is older than max_age. Until the leader has persisted the new
+        day's calendar, a worker rolls its copy forward in memory (or, with
+        no copy yet, builds one in memory); it never writes the table.
+        """
+        if self._is_fresh():
+            return
+        with self._load_lock:
+            if self._is_fresh() or self.load_persisted():
+                return
+            today = date.today()
+            if self.start == today:
+                # Persisted calendar not rebuilt yet; retry after max_age
+                self._loaded_at = time.monotonic()
+            elif self.start is None or not self._roll_forward(today):
+                self.rebuild_from_reservations(persist=False)
+
+    def _is_fresh(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or self.start != date.today():
+            return False
+        return self.max_age is None or time.monotonic() - loaded_at <= self.max_age
+
+    def _roll_forward(self, start):
+        """
+        Shift the matrix to start at ``start``, counting only the newly
+        covered nights from the Reservation table. Returns False when the
+        old window does not overlap the new one.
+        """
+        shift = (start - self.start).days
+        if not 0 < shift < self.horizon:
+            return False
+        old_end = self.start + timedelta(days=self.horizon)
+        reservations = _live_reservations(old_end, start + timedelta(days=self.horizon))
+        with self._lock:
+            tail = _count_nights(self._rows, reservations, old_end.toordinal(), shift)
+            self._counts = np.concatenate([self._counts[:, shift:], tail], axis=1)
+            self.start = start
+            self._loaded_at = time.monotonic()
+        return True
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def refresh_room(self, room_id):
+        """
+        Recount one room's nights from its reservations after a booking or
+        cancellation has been committed, and write them to room_calendar and
+        to the in-memory matrix. The room's row is locked first, so
+        concurrent refreshes of the same room (from any worker) apply in
+        turn and the last one sees every committed reservation.
+        """
+        self.ensure_fresh()
+        start = self.start
+        end = start + timedelta(days=self.horizon)
+        try:
+            # Make sure the row exists so there is something to lock: a
+            # concurrent insert of the same room (another refresh, persist)
+            # is waited for instead of failing on the primary key
+            db.session.execute(_insert_missing(), [{
+                "room_id": room_id, "start_date": start, "nights": self.horizon,
+                "occupancy": bytes((self.horizon + 7) // 8), "updated_at": datetime.now(timezone.utc),
+            }])
+            entry = db.session.execute(
+                select(RoomCalendar).where(RoomCalendar.room_id == room_id).with_for_update()
+            ).scalar_one()
+            reservations = _live_reservations(start, end).filter(Reservation.room_id == room_id)
+            counts = _count_nights({room_id: 0}, reservations, start.toordinal(), self.horizon)[0]
+            entry.start_date = start
+            entry.nights = self.horizon
+            entry.occupancy = np.packbits(counts > 0).tobytes()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        with self._lock:
+            row = self._rows.get(room_id)
+            if row is not None and self.start == start:
+                self._counts[row] = counts
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def covers(self, check_in, check_out):
+        """
+        Return True if [check_in, check_out) falls inside the mirrored window.
+        """
+        if self.start is None:
+            return False
+        first = to_night(check_in) - self.start.toordinal()
+        last = to_night(check_out) - self.start.toordinal()
+        return 0 <= first < last <= self.horizon
+
+    def free_room_ids(self, check_in, check_out):
+        """
+        Return the ids of bookable rooms with no occupied night in [check_in, check_out).
+        """
+        with self._lock:
+            first, last = self._window(check_in, check_out)
+            if first >= last:
+                return self._room_ids[self._bookable].tolist()
+            free = ~self._counts[:, first:last].any(axis=1) & self._bookable
+            return self._room_ids[free].tolist()
+
+    def nights_free(self, room_id, check_in, check_out):
+        """
+        Return a boolean array, one entry per night, telling whether the room is free.
+        """
+        with self._lock:
+            row = self._rows[room_id]
+            first, last = self._window(check_in, check_out)
+            return self._counts[row, first:last] == 0
+
+    def _window(self, check_in, check_out):
+        offset = self.start.toordinal()
+        first = min(max(to_night(check_in) - offset, 0), self.horizon)
+        last = min(max(to_night(check_out) - offset, 0), self.horizon)
+        return first, last
+
+
+def _insert_missing():
+    """
+    INSERT into room_calendar that skips rooms which already have a row.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(RoomCalendar).on_conflict_do_nothing(index_elements=["room_id"])
+    if dialect == "sqlite":
+        return sqlite.insert(RoomCalendar).on_conflict_do_nothing(index_elements=["room_id"])
+    return insert(RoomCalendar)
+
+
+def _live_reservations(start, end):
+    """
+    (room_id, check_in, check_out) of non-cancelled stays overlapping [start, end).
+    """
+    return Reservation.query.with_entities(
+        Reservation.room_id, Reservation.check_in_date, Reservation.check_out_date
+    ).filter(
+        Reservation.status != "cancelled",
+        Reservation.check_out_date > datetime.combine(start, datetime.min.time()),
+        Reservation.check_in_date < datetime.combine(end, datetime.min.time()),
+    )
+
+
+def _count_nights(rows, reservations, first, nights):
+    """
+    Reservations covering each of ``nights`` nights from day ordinal
+    ``first``, as a (len(rows), nights) matrix; ``rows`` maps room ids to
+    matrix rows.
+    """
+    # Difference array: +1 on the check-in night, -1 on the check-out night,
+    # then a cumulative sum along the nights axis yields the counts.
+    diff = np.zeros((len(rows), nights + 1), dtype=np.int32)
+    starts, ends, row_index = [], [], []
+    for room_id, check_in, check_out in reservations:
+        row = rows.get(room_id)
+        if row is None:
+            continue
+        row_index.append(row)
+        starts.append(to_night(check_in) - first)
+        ends.append(to_night(check_out) - first)
+    if row_index:
+        row_index = np.asarray(row_index)
+        starts = np.clip(np.asarray(starts), 0, nights)
+        ends = np.clip(np.asarray(ends), 0, nights)
+        keep = ends > starts
+        np.add.at(diff, (row_index[keep], starts[keep]), 1)
+        np.add.at(diff, (row_index[keep], ends[keep]), -1)
+    return np.cumsum(diff, axis=1)[:, :nights].astype(np.int16)
+
+
+# Shared calendar used by the request handlers
+inventory_calendar = InventoryCalendar()
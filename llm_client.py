@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.llama-api.com"
+DEFAULT_MODEL = "llama3.2-11b-vision"
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """
+    Raised when the Llama API cannot produce a completion.
+    """
+
+
+def _backoff_delay(attempt, base, cap, retry_after=None):
+    """
+    Full-jitter exponential backoff, honouring a Retry-After header when present.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), cap)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def env_settings():
+    """
+    Client settings read from LLAMA_* environment variables.
+    """
+    return {
+        "base_url": os.getenv("LLAMA_API_BASE_URL", DEFAULT_BASE_URL),
+        "api_key": os.getenv("LLAMA_API_KEY"),
+        "model": os.getenv("LLAMA_MODEL", DEFAULT_MODEL),
+        "connect_timeout": float(os.getenv("LLAMA_CONNECT_TIMEOUT", "3.05")),
+        "read_timeout": float(os.getenv("LLAMA_READ_TIMEOUT", "60")),
+        "max_concurrency": int(os.getenv("LLAMA_MAX_CONCURRENCY", "16")),
+        "max_retries": int(os.getenv("LLAMA_MAX_RETRIES", "3")),
+    }
+
+
+def build_payload(model, messages, stream=False, temperature=0.5, max_tokens=1000):
+    """
+    Request body for /chat/completions.
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+class LlamaClient:
+    """
+    Pooled, thread-safe client for the Llama /chat/completions endpoint.
+
+    A single requests.Session keeps connections alive between calls, so only
+    the first request pays for TCP/TLS setup. Concurrency is bounded by a
+    semaphore, and 429/5xx responses or connection errors are retried with
+    jittered backoff. Streaming calls are only retried before the first byte
+    has been handed to the caller.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, api_key=None, model=DEFAULT_MODEL,
+                 connect_timeout=3.05, read_timeout=60, max_concurrency=16,
+                 max_retries=3, backoff=0.25, backoff_cap=4.0, pool_size=None):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "errors": 0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or max_concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self._headers())
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """
+        Build a client from LLAMA_* environment variables.
+        """
+        return cls(**{**env_settings(), **overrides})
+
+    @property
+    def url(self):
+        return f"{self.base_url}/chat/completions"
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def payload(self, messages, **options):
+        return build_payload(self.model, messages, **options)
+
+    def _post(self, payload, stream):
+        """
+        POST with retries; returns a successful response (caller must close it).
+        """
+        self._bump("requests")
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._bump("retries")
+            try:
+                response = self.session.post(self.url, json=payload, stream=stream, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    self._bump("errors")
+                    raise LLMError(f"Llama API unreachable: {e}") from e
+                delay = _backoff_delay(attempt, self.backoff, self.backoff_cap)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError as e:
+                        response.close()
+                        self._bump("errors")
+                        raise LLMError(f"Llama API error: {e}") from e
+                    return response
+                response.close()
+                if attempt == self.max_retries:
+                    self._bump("errors")
+                    raise LLMError(f"Llama API returned {response.status_code} after {attempt + 1} attempts")
+                delay = _backoff_delay(attempt, self.backoff, self.backoff_cap, response.headers.get("Retry-After"))
+            logger.warning("Llama API attempt %d failed, retrying in %.2fs", attempt + 1, delay)
+            time.sleep(delay)
+
+    def complete(self, messages, **options):
+        """
+        Run a non-streaming completion and return the assistant's message content.
+        """
+        with self._slots:
+            response = self._post(self.payload(messages, **options), stream=False)
+            with response:
+                return response.json()["choices"][0]["message"]["content"]
+
+    @contextmanager
+    def stream(self, messages, **options):
+        """
+        Open a streaming completion and yield the raw response.
+
+        The concurrency slot and the pooled connection are held until the
+        with-block exits.
+        """
+        with self._slots:
+            response = self._post(self.payload(messages, stream=True, **options), stream=True)
+            with response:
+                yield response
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats, in_flight=self.max_concurrency - self._slots._value)
+
+    def close(self):
+        self.session.close()
+
+    def _bump(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+
+class AsyncLlamaClient:
+    """
+    asyncio variant of LlamaClient built on aiohttp.
+
+    Shares the same retry, timeout and concurrency semantics. aiohttp is only
+    needed when this class is used.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, api_key=None, model=DEFAULT_MODEL,
+                 connect_timeout=3.05, read_timeout=60, max_concurrency=16,
+                 max_retries=3, backoff=0.25, backoff_cap=4.0):
+        import aiohttp
+
+        self._aiohttp = aiohttp
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._session = None
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """
+        Build a client from LLAMA_* environment variables.
+        """
+        return cls(**{**env_settings(), **overrides})
+
+    @property
+    def url(self):
+        return f"{self.base_url}/chat/completions"
+
+    def payload(self, messages, **options):
+        return build_payload(self.model, messages, **options)
+
+    def _get_session(self):
+        # Created lazily so the session binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = self._aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+            self._session = self._aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+            )
+        return self._session
+
+    async def _post(self, payload):
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await session.post(self.url, json=payload)
+            except (self._aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"Llama API unreachable: {e}") from e
+                delay = _backoff_delay(attempt, self.backoff, self.backoff_cap)
+            else:
+                if response.status not in RETRY_STATUSES:
+                    if response.status >= 400:
+                        response.release()
+                        raise LLMError(f"Llama API error: {response.status}")
+                    return response
+                response.release()
+                if attempt == self.max_retries:
+                    raise LLMError(f"Llama API returned {response.status} after {attempt + 1} attempts")
+                delay = _backoff_delay(attempt, self.backoff, self.backoff_cap, response.headers.get("Retry-After"))
+            logger.warning("Llama API attempt %d failed, retrying in %.2fs", attempt + 1, delay)
+            await asyncio.sleep(delay)
+
+    async def complete(self, messages, **options):
+        async with self._slots:
+            response = await self._post(self.payload(messages, **options))
+            async with response:
+                data = await response.json()
+                return data["choices"][0]["message"]["content"]
+
+    @asynccontextmanager
+    async def stream(self, messages, **options):
+        """
+        Open a streaming completion and yield the aiohttp response;
+        iterate ``response.content.iter_any()`` for raw chunks.
+        """
+        async with self._slots:
+            response = await self._post(self.payload(messages, stream=True, **options))
+            async with response:
+                yield response
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, Memory
+
+# Users whose memory dict is kept in process
+DEFAULT_MAX_USERS = 10000
+# Seconds before a cached dict is re-read (picks up writes from other workers)
+DEFAULT_MAX_AGE = 300
+
+# Column limits from the Memory model
+KEY_LENGTH = 100
+VALUE_LENGTH = 500
+
+
+def _insert_for(dialect_name):
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    return None
+
+
+class MemoryStore:
+    """
+    Per-user key/value memory backed by the Memory table.
+
+    Reads are served from a write-through, LRU-bounded dict per user. Writes
+    re-read the user's rows from the table (never the cache, which may be
+    stale when another worker wrote since), skip values that are already
+    stored and send the rest as one bulk INSERT ... ON CONFLICT (user_id, key)
+    DO UPDATE.
+    """
+
+    def __init__(self, max_users=DEFAULT_MAX_USERS, max_age=DEFAULT_MAX_AGE):
+        self.max_users = max_users
+        self.max_age = max_age
+        self._cache = OrderedDict()  # user_id -> (memory dict, loaded_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        Return a copy of the user's memory dict.
+        """
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is not None and (self.max_age is None or time.monotonic() - entry[1] <= self.max_age):
+                self._cache.move_to_end(user_id)
+                return dict(entry[0])
+
+        memories = self._load(user_id)
+        self._remember(user_id, memories)
+        return dict(memories)
+
+    def upsert(self, user_id, values):
+        """
+        Store ``values`` for the user, overwriting existing keys. Returns the
+        number of keys actually written.
+        """
+        values = {str(key)[:KEY_LENGTH]: str(value)[:VALUE_LENGTH] for key, value in values.items() if value is not None}
+        current = self._load(user_id)
+        changed = {key: value for key, value in values.items() if current.get(key) != value}
+        if not changed:
+            self._remember(user_id, current)
+            return 0
+
+        now = datetime.now(timezone.utc)
+        rows = [{"user_id": user_id, "key": key, "value": value, "created_at": now, "updated_at": now}
+                for key, value in changed.items()]
+        insert = _insert_for(db.engine.dialect.name)
+        try:
+            if insert is not None:
+                statement = insert(Memory).values(rows)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[Memory.user_id, Memory.key],
+                    set_={"value": statement.excluded.value, "updated_at": statement.excluded.updated_at},
+                )
+                db.session.execute(statement)
+            else:
+                self._upsert_portable(user_id, changed, now)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self.invalidate(user_id)
+            raise
+
+        # Write-through: the cached dict now matches the table
+        current.update(changed)
+        self._remember(user_id, current)
+        return len(changed)
+
+    def _load(self, user_id):
+        rows = Memory.query.with_entities(Memory.key, Memory.value).filter(Memory.user_id == user_id)
+        return {row.key: row.value for row in rows}
+
+    def _upsert_portable(self, user_id, changed, now):
+        existing = {memory.key: memory for memory in Memory.query.filter(
+            Memory.user_id == user_id, Memory.key.in_(list(changed))
+        )}
+        for key, value in changed.items():
+            memory = existing.get(key)
+            if memory is None:
+                db.session.add(Memory(user_id=user_id, key=key, value=value, created_at=now, updated_at=now))
+            else:
+                memory.value = value
+                memory.updated_at = now
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def _remember(self, user_id, memories):
+        with self._lock:
+            self._cache[user_id] = (memories, time.monotonic())
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_users:
+                self._cache.popitem(last=False)
+
+
+# Shared store used by the request handlers
+memory_store = MemoryStore()
@@ -0,0 +1,196 @@
+import math
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from sqlalchemy import event
+
+# Seconds; from a cache hit up to a long LLM stream
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(value)
+    return str(int(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+class Counter:
+    """
+    Monotonic count, optionally split by one label: ``counter.inc(label="stream")``.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelname=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelname = labelname
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, label=None):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label, value in sorted(values.items(), key=lambda item: str(item[0])):
+            yield self.name + "_total", {self.labelname: label} if self.labelname else {}, value
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram, optionally split by one label.
+
+    ``observe`` is a bisect and a few additions under a lock, cheap enough
+    for every request; ``time(label)`` measures a with-block.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelname=None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelname = labelname
+        self.buckets = tuple(buckets)
+        self._series = {}  # label -> [count per bucket (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, label=None):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, label=None):
+        return _Timer(self, label)
+
+    def samples(self):
+        with self._lock:
+            series = {label: (list(counts), total) for label, (counts, total) in self._series.items()}
+        for label, (counts, total) in sorted(series.items(), key=lambda item: str(item[0])):
+            labels = {self.labelname: label} if self.labelname else {}
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield self.name + "_bucket", dict(labels, le=_format_value(float(bound))), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, cumulative
+
+
+class _Timer:
+    # A plain class rather than @contextmanager, which costs about twice as much
+
+    __slots__ = ("histogram", "label", "started")
+
+    def __init__(self, histogram, label):
+        self.histogram = histogram
+        self.label = label
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, self.label)
+
+
+class Registry:
+    """
+    The metrics of this process, rendered in the Prometheus text format.
+
+    Besides its own counters and histograms it exports, as gauges, the
+    numeric fields of ``stats()`` sources registered with
+    ``add_stats(name, fn)`` (``chatbot_<name>_<field>``), read at scrape
+    time. Each worker process keeps its own registry, like the /stats routes.
+    """
+
+    def __init__(self, prefix="chatbot"):
+        self.prefix = prefix
+        self._metrics = []
+        self._stats_sources = {}
+
+    def counter(self, name, documentation, labelname=None):
+        return self._add(Counter(f"{self.prefix}_{name}", documentation, labelname))
+
+    def histogram(self, name, documentation, labelname=None, buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(f"{self.prefix}_{name}", documentation, labelname, buckets))
+
+    def add_stats(self, name, stats):
+        self._stats_sources[name] = stats
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in metric.samples())
+        for source, stats in list(self._stats_sources.items()):
+            try:
+                values = stats()
+            except Exception:
+                continue
+            for field, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                elif not isinstance(value, (int, float)):
+                    continue
+                name = f"{self.prefix}_{source}_{field}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+registry = Registry()
+
+# Per-stage latency of a /chat turn
+chat_stage_seconds = registry.histogram(
+    "chat_stage_seconds", "Time spent in each stage of a /chat turn.", labelname="stage")
+llm_stream_chunks = registry.counter("llm_stream_chunks", "Content chunks streamed from the Llama API.")
+llm_stream_errors = registry.counter("llm_stream_errors", "Llama API streams that failed before finishing.")
+db_pool_events = registry.counter("db_pool_events", "Database connection pool events.", labelname="event")
+
+_instrumented_engines = weakref.WeakSet()
+
+
+def instrument_engine(engine):
+    """
+    Count the pool's connections and checkouts, and export its size and
+    checked-out connections as ``chatbot_db_pool_*`` gauges.
+    """
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+    for name in ("connect", "checkout", "checkin", "invalidate"):
+        event.listen(engine, name, lambda *args, _name=name: db_pool_events.inc(label=_name))
+
+    def pool_stats():
+        pool = engine.pool
+        stats = {}
+        for field in ("size", "checkedout", "overflow", "checkedin"):
+            method = getattr(pool, field, None)
+            if method is not None:
+                stats[field] = method()
+        return stats
+
+    registry.add_stats("db_pool", pool_stats)
@@ -0,0 +1,39 @@
+"""Add room booking_version and reservation overlap exclusion
+
+Revision ID: 34d7b16d84c8
+Revises: 8d20403f7156
+Create Date: 2026-10-17 10:41:05.118422
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '34d7b16d84c8'
+down_revision = '8d20403f7156'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('room', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('booking_version', sa.Integer(), server_default='0', nullable=False))
+
+    # On PostgreSQL let the database itself refuse overlapping live reservations.
+    # Existing overlaps must be resolved before this constraint can be created.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.execute("""
+            ALTER TABLE reservation ADD CONSTRAINT reservation_no_overlap
+            EXCLUDE USING gist (room_id WITH =, tsrange(check_in_date, check_out_date) WITH &&)
+            WHERE (status IS DISTINCT FROM 'cancelled')
+        """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE reservation DROP CONSTRAINT IF EXISTS reservation_no_overlap")
+
+    with op.batch_alter_table('room', schema=None) as batch_op:
+        batch_op.drop_column('booking_version')
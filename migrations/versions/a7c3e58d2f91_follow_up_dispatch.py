@@ -0,0 +1,46 @@
+"""Index follow-ups for the dispatcher and move pending conversation follow-ups over
+
+Revision ID: a7c3e58d2f91
+Revises: e4a9c03b7d15
+Create Date: 2026-10-17 21:26:51.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e58d2f91'
+down_revision = 'e4a9c03b7d15'
+branch_labels = None
+depends_on = None
+
+
+def _partial(where):
+    return {'postgresql_where': sa.text(where), 'sqlite_where': sa.text(where)}
+
+
+def upgrade():
+    with op.batch_alter_table('follow_up', schema=None) as batch_op:
+        batch_op.create_index('idx_follow_up_due', ['scheduled_at'], unique=False, **_partial("status = 'scheduled'"))
+        batch_op.create_index('idx_follow_up_sending', ['sent_at'], unique=False, **_partial("status = 'sending'"))
+
+    # Follow-ups used to be read from conversation.follow_up_date, and past
+    # ones were re-sent every day. Queue the pending ones once per user.
+    op.execute("""
+        INSERT INTO follow_up (user_id, message, scheduled_at, status)
+        SELECT user_id,
+               'Just checking in! Do you need help with anything else for your upcoming reservation?',
+               MIN(follow_up_date), 'scheduled'
+        FROM conversation
+        WHERE follow_up_date > CURRENT_TIMESTAMP
+        GROUP BY user_id
+    """)
+    op.execute("UPDATE conversation SET follow_up_date = NULL WHERE follow_up_date IS NOT NULL")
+
+
+def downgrade():
+    # The moved follow-ups stay in follow_up
+    with op.batch_alter_table('follow_up', schema=None) as batch_op:
+        batch_op.drop_index('idx_follow_up_sending')
+        batch_op.drop_index('idx_follow_up_due')
@@ -0,0 +1,36 @@
+"""Compact duplicate memories and make (user_id, key) unique
+
+Revision ID: ae934894e62f
+Revises: 57f23f45052d
+Create Date: 2026-10-17 14:52:30.871946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ae934894e62f'
+down_revision = '57f23f45052d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only the most recently written row for each (user_id, key)
+    op.execute("""
+        DELETE FROM memory
+        WHERE id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MAX(id) AS keep_id FROM memory GROUP BY user_id, key
+            ) AS latest
+        )
+    """)
+
+    with op.batch_alter_table('memory', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_memory_user_key', ['user_id', 'key'])
+
+
+def downgrade():
+    with op.batch_alter_table('memory', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_memory_user_key', type_='unique')
@@ -0,0 +1,26 @@
+"""Index conversation history for keyset pagination
+
+Revision ID: c5e2a7d91b43
+Revises: ae934894e62f
+Create Date: 2026-10-17 18:05:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e2a7d91b43'
+down_revision = 'ae934894e62f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.create_index('idx_conversation_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_index('idx_conversation_user_created')
@@ -0,0 +1,26 @@
+"""Index reservations by user and check-in date
+
+Revision ID: d81f4b6c2e07
+Revises: c5e2a7d91b43
+Create Date: 2026-10-17 19:12:40.227961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f4b6c2e07'
+down_revision = 'c5e2a7d91b43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.create_index('idx_reservation_user_check_in', ['user_id', 'check_in_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.drop_index('idx_reservation_user_check_in')
@@ -0,0 +1,56 @@
+"""Partial indexes for hot queries, drop duplicate user_id indexes
+
+Revision ID: e4a9c03b7d15
+Revises: d81f4b6c2e07
+Create Date: 2026-10-17 20:03:27.645190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c03b7d15'
+down_revision = 'd81f4b6c2e07'
+branch_labels = None
+depends_on = None
+
+
+def _partial(where):
+    return {'postgresql_where': sa.text(where), 'sqlite_where': sa.text(where)}
+
+
+def upgrade():
+    # user_id was indexed twice per table (index=True plus a named Index).
+    # conversation and memory are covered by the leading column of
+    # idx_conversation_user_created and uq_memory_user_key, so both go.
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_conversation_user_id'))
+        batch_op.drop_index('idx_conversation_user_id')
+
+    with op.batch_alter_table('memory', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_memory_user_id'))
+        batch_op.drop_index('idx_memory_user_id')
+
+    with op.batch_alter_table('follow_up', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_follow_up_user_id'))
+
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.create_index('idx_reservation_room_live', ['room_id', 'check_in_date'], unique=False,
+                              **_partial("status <> 'cancelled'"))
+
+
+def downgrade():
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.drop_index('idx_reservation_room_live')
+
+    with op.batch_alter_table('follow_up', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_follow_up_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('memory', schema=None) as batch_op:
+        batch_op.create_index('idx_memory_user_id', ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_memory_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.create_index('idx_conversation_user_id', ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_conversation_user_id'), ['user_id'], unique=False)
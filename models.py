@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import CheckConstraint, Index, Text
+from sqlalchemy import CheckConstraint, Index, Text, UniqueConstraint, text
 
 db = SQLAlchemy()
 
@@ -52,6 +52,7 @@ class Room(db.Model):
     availability = db.Column(db.Boolean, default=True)  # True if available
     max_guests = db.Column(db.Integer, nullable=False)
     amenities = db.Column(db.String(500), nullable=False)  # e.g., "WiFi, AC, TV"
+    booking_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on every booking
     reservations = db.relationship('Reservation', back_populates='room', lazy=True)
     hotel = db.relationship('Hotel', back_populates='rooms')
 
@@ -69,9 +70,26 @@ class Reservation(db.Model):
     user = db.relationship('User', back_populates='reservations')
     room = db.relationship('Room', back_populates='reservations')
 
+    __table_args__ = (
+        Index('idx_reservation_user_check_in', 'user_id', 'check_in_date'),  # A guest's reservations by date
+        # Overlap checks for one room only ever look at live reservations
+        Index('idx_reservation_room_live', 'room_id', 'check_in_date',
+              postgresql_where=text("status <> 'cancelled'"), sqlite_where=text("status <> 'cancelled'")),
+    )
+
     def __repr__(self):
         return f'<Reservation {self.id}>'
 
+class RoomCalendar(db.Model):
+    room_id = db.Column(db.Integer, db.ForeignKey('room.id'), primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)  # First night covered by the bitmap
+    nights = db.Column(db.Integer, nullable=False)  # Number of nights covered
+    occupancy = db.Column(db.LargeBinary, nullable=False)  # One bit per night, 1 = booked
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<RoomCalendar {self.room_id} from {self.start_date}>'
+
 class Review(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -92,7 +110,7 @@ class Review(db.Model):
 
 class Conversation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     message = db.Column(db.String(2000), nullable=False)
     response = db.Column(Text, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -102,15 +120,24 @@ class Conversation(db.Model):
     user = db.relationship('User', back_populates='conversations')
 
     __table_args__ = (
-        Index('idx_conversation_user_id', 'user_id'),
+        Index('idx_conversation_user_created', 'user_id', 'created_at', 'id'),  # Keyset pages of a user's history
     )
 
     def __repr__(self):
         return f'<Conversation {self.id}>'
 
+class ConversationSummary(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    summary = db.Column(Text, nullable=False, default="")  # Running summary of turns folded out of the prompt
+    last_conversation_id = db.Column(db.Integer, nullable=False, default=0)  # Newest Conversation folded into the summary
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<ConversationSummary for User {self.user_id}>'
+
 class Memory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     key = db.Column(db.String(100), nullable=False)  # e.g., "preferred_room_type", "frequent_destination"
     value = db.Column(db.String(500), nullable=False)  # e.g., "suite", "New York"
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -119,7 +146,7 @@ class Memory(db.Model):
     user = db.relationship('User', back_populates='memories')
 
     __table_args__ = (
-        Index('idx_memory_user_id', 'user_id'),
+        UniqueConstraint('user_id', 'key', name='uq_memory_user_key'),  # Also serves lookups by user_id
     )
 
     def __repr__(self):
@@ -127,16 +154,21 @@ class Memory(db.Model):
 
 class FollowUp(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     message = db.Column(db.String(1000), nullable=False)
     scheduled_at = db.Column(db.DateTime, nullable=False)
     sent_at = db.Column(db.DateTime, nullable=True)
-    status = db.Column(db.String(50), default='scheduled')  # e.g., "scheduled", "sent", "failed"
+    status = db.Column(db.String(50), default='scheduled')  # "scheduled", "sending", "sent" or "failed"
 
     user = db.relationship('User', back_populates='follow_ups')
 
     __table_args__ = (
         Index('idx_follow_up_user_id', 'user_id'),
+        # Dispatcher claims: due rows, and claims whose lease ran out (sent_at is the claim time while sending)
+        Index('idx_follow_up_due', 'scheduled_at',
+              postgresql_where=text("status = 'scheduled'"), sqlite_where=text("status = 'scheduled'")),
+        Index('idx_follow_up_sending', 'sent_at',
+              postgresql_where=text("status = 'sending'"), sqlite_where=text("status = 'sending'")),
     )
 
     def __repr__(self):
@@ -0,0 +1,110 @@
+import multiprocessing
+from itertools import islice
+
+from models import db, Conversation
+from nlp_utils import analyze_sentiment, clean_text, correct_spelling, detect_intents, extract_entities
+
+DEFAULT_CHUNK_SIZE = 500
+# Distinct cleaned texts whose correction is remembered per process
+MAX_MEMOIZED_TEXTS = 100000
+
+_corrections = {}
+
+
+def stored_messages(yield_per=5000):
+    """
+    Stream Conversation.message for every stored turn without loading the
+    table into memory. Must be called inside an application context.
+    """
+    query = db.session.query(Conversation.message).order_by(Conversation.id).execution_options(yield_per=yield_per)
+    for row in query:
+        yield row.message
+
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _preprocess_chunk(messages):
+    # Guest messages repeat heavily; spell-correct each distinct text once
+    # per process (the memo is simply dropped when it grows too large)
+    corrected = _corrections
+    if len(corrected) > MAX_MEMOIZED_TEXTS:
+        corrected.clear()
+    results = []
+    for message in messages:
+        cleaned = clean_text(message)
+        text = corrected.get(cleaned)
+        if text is None:
+            text = corrected[cleaned] = correct_spelling(cleaned)
+        results.append(text)
+    return results
+
+
+def _analyze_chunk(messages):
+    texts = _preprocess_chunk(messages)
+    return [
+        {
+            "text": text,
+            "intent": intent,
+            "entities": extract_entities(message),
+            "sentiment": analyze_sentiment(text),
+        }
+        for message, text, intent in zip(messages, texts, detect_intents(texts))
+    ]
+
+
+def _map_chunks(function, messages, processes, chunksize):
+    chunks = iter_chunks(messages, chunksize)
+    if not processes or processes <= 1:
+        for chunk in chunks:
+            yield from function(chunk)
+        return
+
+    # Fork where available so workers inherit the loaded SymSpell dictionary
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with context.Pool(processes) as pool:
+        for results in pool.imap(function, chunks):
+            yield from results
+
+
+def preprocess_batch(messages, processes=1, chunksize=DEFAULT_CHUNK_SIZE):
+    """
+    Yield preprocess_input(message) for every message, in order.
+    """
+    yield from _map_chunks(_preprocess_chunk, messages, processes, chunksize)
+
+
+def detect_intent_batch(texts, chunksize=DEFAULT_CHUNK_SIZE):
+    """
+    Yield detect_intent(text) for already preprocessed texts.
+    """
+    for chunk in iter_chunks(texts, chunksize):
+        yield from detect_intents(chunk)
+
+
+def extract_entities_batch(messages):
+    """
+    Yield extract_entities(message) for raw (not preprocessed) messages.
+    """
+    for message in messages:
+        yield extract_entities(message)
+
+
+def analyze_batch(messages, processes=1, chunksize=DEFAULT_CHUNK_SIZE):
+    """
+    Run the full pipeline over raw messages and yield one dict per message
+    (preprocessed text, intent, entities, sentiment), in input order.
+    Results match preprocess_input / detect_intent / analyze_sentiment
+    applied one message at a time, with extract_entities on the raw message.
+
+    ``processes`` > 1 spreads chunks over a process pool; pass
+    os.cpu_count() to use every core.
+    """
+    yield from _map_chunks(_analyze_chunk, messages, processes, chunksize)
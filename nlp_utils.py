@@ -1,15 +1,70 @@
 import re
-from symspellpy import SymSpell
 import os
+import threading
 from models import Room  # Import the Room model
 from datetime import datetime
+from availability import availability_index
+from inventory_calendar import inventory_calendar
+from room_ranking import room_ranking_index
+from spell_index import load_sym_spell
+from spelling import SpellingCorrector
+from intent_model import DEFAULT_MIN_CONFIDENCE, load_intent_classifier
+from entities import ROOM_TYPES, EntityExtractor
 
 # Suppress TensorFlow warnings (if TensorFlow is still used elsewhere)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
-# Initialize SymSpell for spelling correction
-sym_spell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
-sym_spell.load_dictionary("frequency_dictionary_en_82_765.txt", term_index=0, count_index=1)
+# Precompiled patterns shared by the per-message functions and nlp_batch
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-zA-Z0-9\s]')
+
+# Intent keywords, checked in priority order
+INTENT_KEYWORDS = [
+    ("view_reservations", ("my reservations", "my bookings", "show reservations", "list reservations")),
+    ("book_room", ("book", "reserve")),
+    ("cancel_reservation", ("cancel",)),
+    ("modify_reservation", ("modify", "change")),
+    # Check-in/out questions ("what time is check out") are not availability checks
+    ("general_inquiry", ("check out", "checkout", "check in", "checkin")),
+    ("check_availability", ("availability", "check")),
+]
+
+# SymSpell for spelling correction. The delete-variant index is prebuilt
+# (python spell_index.py) and memory-mapped so forked workers share it; it is
+# loaded on first use unless SYMSPELL_EAGER=1 asks for it at import time.
+DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frequency_dictionary_en_82_765.txt")
+_sym_spell = None
+_sym_spell_lock = threading.Lock()
+
+def get_sym_spell():
+    global _sym_spell
+    if _sym_spell is None:
+        with _sym_spell_lock:
+            if _sym_spell is None:
+                _sym_spell = load_sym_spell(DICTIONARY_PATH, max_edit_distance=2, prefix_length=7)
+    return _sym_spell
+
+if os.getenv("SYMSPELL_EAGER") == "1":
+    get_sym_spell()
+
+# Trained intent classifier. The artifact is built from the shipped labeled
+# examples (python intent_model.py [EXPORT]) or, when missing or older than
+# them, on first use; for low-confidence predictions, or when no classifier
+# can be loaded, the keyword rules are used.
+INTENT_EXAMPLES_PATH = os.getenv("INTENT_EXAMPLES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_examples.jsonl"))
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model.npz"))
+INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE))
+_intent_classifier = None
+_intent_classifier_loaded = False
+_intent_classifier_lock = threading.Lock()
+
+def get_intent_classifier():
+    global _intent_classifier, _intent_classifier_loaded
+    if not _intent_classifier_loaded:
+        with _intent_classifier_lock:
+            if not _intent_classifier_loaded:
+                _intent_classifier = load_intent_classifier(INTENT_MODEL_PATH, INTENT_EXAMPLES_PATH)
+                _intent_classifier_loaded = True
+    return _intent_classifier
 
 def get_available_rooms(check_in_date, check_out_date):
     """
@@ -21,13 +76,26 @@ def get_available_rooms(check_in_date, check_out_date):
     if isinstance(check_out_date, str):
         check_out_date = datetime.strptime(check_out_date, "%Y-%m-%d")
 
-    # Query rooms that are available and not booked during the specified dates
-    available_rooms = Room.query.filter(
-        Room.availability == True  # Only available rooms
-    ).all()
+    room_ids = free_room_ids(check_in_date, check_out_date)
+    if not room_ids:
+        return []
+
+    available_rooms = Room.query.filter(Room.id.in_(room_ids)).order_by(Room.id).all()
 
     return available_rooms
 
+def free_room_ids(check_in_date, check_out_date):
+    """
+    Ids of bookable rooms with no reservation overlapping the stay.
+    """
+    # Stays inside the nightly calendar window are answered with one vectorized
+    # scan; anything further out falls back to the interval index
+    inventory_calendar.ensure_fresh()
+    if inventory_calendar.covers(check_in_date, check_out_date):
+        return inventory_calendar.free_room_ids(check_in_date, check_out_date)
+    availability_index.ensure_fresh()
+    return availability_index.free_room_ids(check_in_date, check_out_date)
+
 def calculate_total_price(room, check_in_date, check_out_date):
     """
     Calculate the total price for a room based on the number of nights.
@@ -48,13 +116,15 @@ def calculate_total_price(room, check_in_date, check_out_date):
 
 def clean_text(text):
     text = text.lower()
-    text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
+    text = NON_ALPHANUMERIC_PATTERN.sub('', text)
     text = " ".join(text.split())
     return text
 
+# Memoized correction that leaves hotel vocabulary, dates and numbers alone
+spelling_corrector = SpellingCorrector(get_sym_spell)
+
 def correct_spelling(text):
-    suggestions = sym_spell.lookup_compound(text, max_edit_distance=2)
-    return suggestions[0].term
+    return spelling_corrector(text)
 
 def preprocess_input(user_input):
     cleaned_text = clean_text(user_input)
@@ -70,44 +140,77 @@ def analyze_sentiment(text):
     else:
         return "Neutral"
 
-# Updated intent detection for hotel reservations
 def detect_intent(text):
-    if "book" in text or "reserve" in text:
-        return "book_room"
-    elif "cancel" in text:
-        return "cancel_reservation"
-    elif "modify" in text or "change" in text:
-        return "modify_reservation"
-    elif "availability" in text or "check" in text:
-        return "check_availability"
-    else:
-        return "general_inquiry"
+    classifier = get_intent_classifier()
+    if classifier is not None:
+        intent, confidence = classifier.predict_one(text)
+        if confidence >= INTENT_MIN_CONFIDENCE:
+            return intent
+    return detect_intent_keywords(text)
+
+def detect_intents(texts):
+    """
+    Batch form of detect_intent: one vectorized pass over the classifier,
+    keyword rules for whatever it is not confident about.
+    """
+    classifier = get_intent_classifier()
+    if classifier is None:
+        return [detect_intent_keywords(text) for text in texts]
+    return [intent if confidence >= INTENT_MIN_CONFIDENCE else detect_intent_keywords(text)
+            for text, (intent, confidence) in zip(texts, classifier.predict(texts))]
+
+# Keyword intent detection, the fallback when no classifier is trained
+def detect_intent_keywords(text):
+    # Plain substring checks: for a handful of keywords on short messages they
+    # beat a compiled alternation in CPython
+    for intent, keywords in INTENT_KEYWORDS:
+        for keyword in keywords:
+            if keyword in text:
+                return intent
+    return "general_inquiry"
+
+# Entity extraction for hotel reservations. Runs on the raw message: dates,
+# prices and place names do not survive preprocess_input.
+entity_extractor = EntityExtractor()
 
-# Updated entity extraction for hotel reservations
 def extract_entities(text):
-    entities = {}
-    # Extract dates (e.g., "check-in on 2023-10-15")
-    date_pattern = r"(\d{4}-\d{2}-\d{2})"
-    dates = re.findall(date_pattern, text)
-    if dates:
-        entities["check_in_date"] = dates[0]
-        if len(dates) > 1:
-            entities["check_out_date"] = dates[1]
-    
-    # Extract room type (e.g., "suite", "double room")
-    room_types = ["single", "double", "suite", "deluxe"]
-    for room_type in room_types:
-        if room_type in text:
-            entities["room_type"] = room_type
-            break
-    
-    # Extract location (e.g., "New York")
-    location_pattern = r"\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b"
-    locations = re.findall(location_pattern, text)
-    if locations:
-        entities["location"] = locations[0]
-    
-    return entities
+    return entity_extractor.extract(text)
+
+def warm_up():
+    """
+    Load everything the first chat turns would otherwise load on demand:
+    SymSpell, the intent model, and (inside an application context) the
+    location gazetteer and the availability and room-ranking indexes.
+    """
+    get_sym_spell()
+    get_intent_classifier()
+    entity_extractor.gazetteer.maybe_refresh()
+    inventory_calendar.ensure_fresh()
+    availability_index.ensure_fresh()
+    room_ranking_index.ensure_fresh()
+
+def suggest_rooms(user_input, limit=5):
+    """
+    Suggest rooms based on user input (e.g., budget, preferences), best match first.
+    """
+    # Extract preferences from user input
+    entities = extract_entities(user_input)
+    room_ranking_index.ensure_fresh()
+    amenities = room_ranking_index.amenities_in(user_input)
+
+    # Only rooms free for the requested stay are ranked
+    room_ids = None
+    if entities.get("check_in_date") and entities.get("check_out_date"):
+        room_ids = free_room_ids(entities["check_in_date"], entities["check_out_date"])
+
+    ranked = room_ranking_index.top_k(
+        limit, budget=entities.get("budget"), guests=entities.get("guests"), amenities=amenities,
+        room_type=entities.get("room_type"), location=entities.get("location"), room_ids=room_ids,
+    )
+    if not ranked:
+        return []
+    rooms = {room.id: room for room in Room.query.filter(Room.id.in_([room_id for room_id, _ in ranked]))}
+    return [rooms[room_id] for room_id, _ in ranked if room_id in rooms]
 
 # Example usage
 if __name__ == "__main__":
@@ -125,37 +228,5 @@ if __name__ == "__main__":
     print(f"Intent: {intent}")
     
     # Extract entities
-    entities = extract_entities(preprocessed_text)
+    entities = extract_entities(user_input)
     print(f"Entities: {entities}")
-
-
-# Add this to nlp_utils.py
-def get_available_rooms(check_in_date, check_out_date):
-    """
-    Query the database for available rooms between the given dates.
-    """
-    available_rooms = Room.query.filter_by(availability=True).all()
-    return available_rooms
-
-def calculate_total_price(room, check_in_date, check_out_date):
-    """
-    Calculate the total price for a room based on the number of nights.
-    """
-    nights = (check_out_date - check_in_date).days
-    return room.price_per_night * nights
-
-def suggest_rooms(user_input):
-    """
-    Suggest rooms based on user input (e.g., budget, preferences).
-    """
-    # Extract preferences from user input
-    budget = re.search(r"\$(\d+)", user_input)
-    budget = float(budget.group(1)) if budget else None
-
-    # Query rooms within the budget
-    if budget:
-        rooms = Room.query.filter(Room.price_per_night <= budget).all()
-    else:
-        rooms = Room.query.all()
-
-    return rooms    
\ No newline at end of file
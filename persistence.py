@@ -0,0 +1,214 @@
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy import String, insert
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 10000
+DEFAULT_BATCH_SIZE = 200
+# Seconds a row may wait in the queue before a partial batch is flushed
+DEFAULT_FLUSH_INTERVAL = 0.5
+# Seconds a producer blocks on a full queue before giving up
+DEFAULT_PUT_TIMEOUT = 2.0
+
+_STOP = object()
+
+
+class QueueFullError(Exception):
+    """
+    Raised when the persistence queue stays full for longer than the put timeout.
+    """
+
+
+class PendingWrite:
+    """
+    Handle for a queued row; ``wait()`` blocks until its batch is committed.
+    """
+
+    def __init__(self, row, on_saved=None):
+        self.row = row
+        self.on_saved = on_saved
+        self.id = None
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+    def _finish(self, row_id=None, error=None):
+        self.id = row_id
+        self.error = error
+        self._done.set()
+
+
+class BatchWriter:
+    """
+    Bounded background writer that turns many single-row saves into
+    multi-row INSERTs.
+
+    One worker thread drains the queue and commits a batch once it reaches
+    ``batch_size`` rows or its oldest row is ``flush_interval`` seconds old.
+    A full queue blocks producers (backpressure) for up to ``put_timeout``
+    seconds. ``close()`` drains everything still queued.
+
+    Values longer than their String column are truncated on submit. If a
+    batch still fails, its rows are retried one at a time so a bad row
+    only loses itself, not the other turns batched with it.
+    """
+
+    def __init__(self, model, app=None, max_queue=DEFAULT_MAX_QUEUE, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, put_timeout=DEFAULT_PUT_TIMEOUT):
+        self.app = app
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Column name -> maximum length, for the String columns that declare one
+        self._max_lengths = {
+            column.name: column.type.length for column in model.__table__.columns
+            if isinstance(column.type, String) and column.type.length
+        }
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "batches": 0, "rows": 0, "failed_rows": 0, "rejected_rows": 0,
+            "last_flush_ms": 0.0, "max_flush_ms": 0.0, "total_flush_ms": 0.0, "max_queue_depth": 0,
+        }
+
+    def init_app(self, app):
+        self.app = app
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"{self.model.__tablename__}-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, row, on_saved=None):
+        """
+        Queue a row (a dict of column values). ``on_saved(row_id)`` is called
+        from the writer thread after the row's batch has been committed.
+        """
+        self.start()
+        pending = PendingWrite(self._fit(row), on_saved)
+        try:
+            self._queue.put(pending, timeout=self.put_timeout)
+        except queue.Full:
+            self._bump("rejected_rows")
+            raise QueueFullError(f"{self.model.__tablename__} write queue is full")
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+        return pending
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_flush_ms"] = stats["total_flush_ms"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+    def close(self, timeout=10):
+        """
+        Flush everything still queued and stop the worker.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _fit(self, row):
+        too_long = {name: value[:self._max_lengths[name]] for name, value in row.items()
+                    if name in self._max_lengths and isinstance(value, str) and len(value) > self._max_lengths[name]}
+        return dict(row, **too_long) if too_long else row
+
+    def _bump(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+        # Drain anything queued behind the stop marker
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            self._flush(leftover[start:start + self.batch_size])
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        table = self.model.__table__
+        with self.app.app_context():
+            try:
+                result = db.session.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                    [pending.row for pending in batch],
+                )
+                row_ids = [row.id for row in result]
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                if len(batch) > 1:
+                    # Find the bad row(s); the rest of the batch still gets written
+                    logger.warning("Failed to write a batch of %d %s rows, retrying them one by one: %s",
+                                   len(batch), table.name, e)
+                    for pending in batch:
+                        self._flush([pending])
+                    return
+                logger.error("Failed to write a %s row: %s", table.name, e)
+                self._bump("failed_rows")
+                batch[0]._finish(error=e)
+                return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["rows"] += len(batch)
+            self._stats["last_flush_ms"] = elapsed_ms
+            self._stats["total_flush_ms"] += elapsed_ms
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], elapsed_ms)
+
+        for pending, row_id in zip(batch, row_ids):
+            pending._finish(row_id)
+            if pending.on_saved is not None:
+                try:
+                    pending.on_saved(row_id)
+                except Exception as e:
+                    logger.error("Post-save hook failed for %s %s: %s", table.name, row_id, e)
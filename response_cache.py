@@ -0,0 +1,211 @@
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from context_builder import estimate_tokens
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+# Estimated Jaccard similarity of word shingles needed for a near-duplicate hit
+DEFAULT_SIMILARITY = 0.5
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 32
+
+# Only answers that do not depend on who is asking are shared between users
+CACHEABLE_INTENTS = frozenset({"general_inquiry"})
+# Words that carry no meaning for the cache key
+FILLER_WORDS = frozenset({
+    "please", "pls", "hi", "hello", "hey", "thanks", "thank", "you", "your", "the", "a", "an", "um", "so", "ok", "okay",
+    "just",
+})
+# Words that point back into the conversation ("what about that?"): such
+# turns need the history, so they are never served from the shared cache
+CONTEXT_WORDS = frozenset({
+    "it", "its", "that", "this", "those", "these", "them", "they", "then", "also", "else", "again",
+    "my", "mine", "me", "our", "us",
+})
+
+_MERSENNE = (1 << 61) - 1
+_rng = np.random.default_rng(20240607)
+_PERM_A = _rng.integers(1, 1 << 31, size=DEFAULT_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=DEFAULT_NUM_PERM, dtype=np.uint64)
+
+# A near-duplicate may only differ from the cached question in these words;
+# any other difference ("...hotel in lisbon" vs "...hotel in tokyo") changes
+# the answer however similar the rest of the message is
+FUNCTION_WORDS = FILLER_WORDS | frozenset({
+    "i", "we", "is", "are", "am", "be", "do", "does", "did", "can", "could", "would", "will", "may", "should",
+    "what", "whats", "when", "which", "how", "at", "in", "on", "for", "of", "to", "from", "with", "and", "or",
+    "any", "have", "has", "get", "there", "here", "yet", "usually", "currently", "exactly", "tell", "know",
+    "like", "want", "need", "id", "im",
+})
+
+CacheKey = namedtuple("CacheKey", ["intent", "text", "words"])
+
+
+def _shingles(words):
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(words):
+    """
+    64-permutation MinHash signature of the message's word unigrams and bigrams.
+    """
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in _shingles(words)), dtype=np.uint64)
+    if not len(hashes):
+        return np.full(DEFAULT_NUM_PERM, _MERSENNE, dtype=np.uint64)
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE).min(axis=1)
+
+
+class ResponseCache:
+    """
+    Shared cache of LLM answers to generic guest questions ("what time is
+    breakfast", "do you allow pets").
+
+    Entries are keyed on intent plus the normalised message. Exact repeats
+    hit the dict; with ``similarity`` set, near-duplicates are found through
+    a MinHash LSH index (``bands`` buckets per entry) and accepted when the
+    estimated Jaccard similarity reaches the threshold and the two differ
+    only in function words ("is", "what", "at"). Entries expire after
+    ``ttl`` seconds and the least recently used go first past
+    ``max_entries``. The cached value is the list of streamed chunks, so a
+    hit replays exactly what the first guest received.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, similarity=DEFAULT_SIMILARITY,
+                 bands=DEFAULT_BANDS, enabled=True):
+        if DEFAULT_NUM_PERM % bands:
+            raise ValueError(f"bands must divide {DEFAULT_NUM_PERM}")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.bands = bands
+        self.enabled = enabled
+        self._rows = DEFAULT_NUM_PERM // bands
+        # (intent, text) -> (parts, signature, expires_at, saved tokens, word set)
+        self._entries = OrderedDict()
+        self._buckets = {}  # (intent, band, band hash) -> set of entry keys
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0, "similar_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0,
+            "saved_prompt_tokens": 0, "saved_completion_tokens": 0,
+        }
+
+    def key_for(self, text, intent, entities=None):
+        """
+        Return the CacheKey for a preprocessed message, or None if the turn
+        must not be shared: a non-generic intent, any extracted entity
+        (dates, room types, budgets are request-specific) or a reference
+        back into the conversation.
+        """
+        if not self.enabled or intent not in CACHEABLE_INTENTS or entities:
+            return None
+        words = [word for word in text.lower().split() if word not in FILLER_WORDS]
+        if not words or any(word in CONTEXT_WORDS for word in words):
+            return None
+        return CacheKey(intent, " ".join(words), tuple(words))
+
+    def get(self, key):
+        """
+        Return the cached chunks for key (or a near-duplicate), or None.
+        """
+        now = time.monotonic()
+        entry_key = (key.intent, key.text)
+        with self._lock:
+            entry = self._live(entry_key, now)
+            if entry is not None:
+                self._counters["hits"] += 1
+                return self._hit(entry_key, entry)
+
+        if self.similarity:
+            signature = minhash(key.words)
+            with self._lock:
+                best_key, best_score = None, self.similarity
+                for candidate in self._candidates(key.intent, signature):
+                    entry = self._live(candidate, now)
+                    if entry is None:
+                        continue
+                    score = float(np.count_nonzero(entry[1] == signature)) / DEFAULT_NUM_PERM
+                    if score >= best_score and set(key.words) ^ entry[4] <= FUNCTION_WORDS:
+                        best_key, best_score = candidate, score
+                if best_key is not None:
+                    self._counters["similar_hits"] += 1
+                    return self._hit(best_key, self._entries[best_key])
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key, parts, prompt_tokens=0):
+        """
+        Store the streamed chunks of an answer. ``prompt_tokens`` is the size
+        of the prompt it took, counted as saved on every later hit.
+        """
+        parts = list(parts)
+        if not parts:
+            return
+        entry_key = (key.intent, key.text)
+        signature = minhash(key.words)
+        saved = (prompt_tokens, estimate_tokens("".join(parts)))
+        with self._lock:
+            if entry_key in self._entries:
+                self._drop(entry_key)
+            self._entries[entry_key] = (parts, signature, time.monotonic() + self.ttl, saved, frozenset(key.words))
+            if self.similarity:
+                for bucket in self._bucket_keys(key.intent, signature):
+                    self._buckets.setdefault(bucket, set()).add(entry_key)
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters, size=len(self._entries))
+        lookups = stats["hits"] + stats["similar_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["similar_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    # Callers below hold self._lock
+
+    def _live(self, entry_key, now):
+        entry = self._entries.get(entry_key)
+        if entry is not None and entry[2] < now:
+            self._drop(entry_key)
+            self._counters["expirations"] += 1
+            return None
+        return entry
+
+    def _hit(self, entry_key, entry):
+        self._entries.move_to_end(entry_key)
+        self._counters["saved_prompt_tokens"] += entry[3][0]
+        self._counters["saved_completion_tokens"] += entry[3][1]
+        return list(entry[0])
+
+    def _bucket_keys(self, intent, signature):
+        rows = self._rows
+        return [(intent, band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _candidates(self, intent, signature):
+        candidates = set()
+        for bucket in self._bucket_keys(intent, signature):
+            candidates.update(self._buckets.get(bucket, ()))
+        return candidates
+
+    def _drop(self, entry_key):
+        entry = self._entries.pop(entry_key)
+        if self.similarity:
+            for bucket in self._bucket_keys(entry_key[0], entry[1]):
+                keys = self._buckets.get(bucket)
+                if keys is not None:
+                    keys.discard(entry_key)
+                    if not keys:
+                        del self._buckets[bucket]
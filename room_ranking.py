@@ -0,0 +1,285 @@
+import logging
+import re
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, Hotel, Room
+
+logger = logging.getLogger(__name__)
+
+# Full reload interval (seconds); changes committed by this process are applied sooner, incrementally
+DEFAULT_MAX_AGE = 300
+# Relative weight of each score component
+WEIGHTS = {"amenities": 3.0, "room_type": 2.0, "rating": 1.0, "price": 1.0}
+# Amenity masks are uint64, so at most this many distinct amenities are indexed
+MAX_AMENITIES = 64
+
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]")
+
+# Indexes that want to hear about committed Room/Hotel changes
+_indexes = []
+
+
+def amenity_key(name):
+    """
+    Normalise an amenity name: "Wi-Fi" and "wifi" or "Mini Bar" and "minibar" are the same.
+    """
+    return _NON_ALPHANUMERIC.sub("", name.lower())
+
+
+def parse_amenities(value):
+    return {key for key in (amenity_key(part) for part in (value or "").split(",")) if key}
+
+
+class RoomRankingIndex:
+    """
+    In-memory, column-oriented index of rooms for preference ranking.
+
+    One row per room holds price, capacity, hotel rating, a room-type code,
+    a hotel-location code and a uint64 bitmask of the room's and hotel's
+    amenities (parsed once from the comma-separated strings). ``top_k``
+    filters and scores every row with NumPy and returns the best room ids.
+
+    Rooms and hotels committed through the ORM are refreshed row by row on
+    the next query; a full reload still happens every ``max_age`` seconds
+    to pick up changes made by other processes.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._amenity_bits = {}  # amenity key -> bit position
+        self._type_codes = {}  # lowercased room type -> code
+        self._location_codes = {}  # lowercased hotel location -> code
+        self._rows = {}  # room_id -> row position
+        self._changed_rooms = set()
+        self._changed_hotels = set()
+        self._loaded_at = None
+        self._set_columns([])
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self, rows):
+        """
+        Rebuild the index from (room_id, hotel_id, room_type, price_per_night,
+        max_guests, room amenities, bookable, hotel amenities, hotel rating,
+        hotel location) tuples.
+        """
+        with self._lock:
+            self._amenity_bits, self._type_codes, self._location_codes = {}, {}, {}
+            self._set_columns([self._encode(row) for row in rows])
+            self._loaded_at = time.monotonic()
+
+    def load_from_db(self):
+        """
+        Rebuild the index from the Room and Hotel tables. Must be called inside an application context.
+        """
+        with self._lock:
+            self._changed_rooms.clear()
+            self._changed_hotels.clear()
+        self.load(_room_rows())
+
+    def ensure_fresh(self):
+        """
+        Load on first use, reload after max_age and otherwise apply committed changes.
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is None or (self.max_age is not None and time.monotonic() - loaded_at > self.max_age):
+            self.load_from_db()
+            return
+        with self._lock:
+            room_ids, hotel_ids = self._changed_rooms, self._changed_hotels
+            if not room_ids and not hotel_ids:
+                return
+            self._changed_rooms, self._changed_hotels = set(), set()
+        self.refresh(room_ids, hotel_ids)
+
+    def refresh(self, room_ids=(), hotel_ids=()):
+        """
+        Re-read the given rooms and every room of the given hotels. Rooms
+        that no longer exist are kept as unbookable rows.
+        """
+        rows = list(_room_rows(room_ids, hotel_ids))
+        with self._lock:
+            found = set()
+            new_rows = []
+            for row in rows:
+                found.add(row[0])
+                encoded = self._encode(row)
+                position = self._rows.get(row[0])
+                if position is None:
+                    new_rows.append(encoded)
+                else:
+                    self._write(position, encoded)
+            for room_id in set(room_ids) - found:
+                position = self._rows.get(room_id)
+                if position is not None:
+                    self._bookable[position] = False
+            if new_rows:
+                self._append(new_rows)
+
+    def mark_changed(self, room_ids=(), hotel_ids=()):
+        with self._lock:
+            self._changed_rooms.update(room_ids)
+            self._changed_hotels.update(hotel_ids)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def amenities_in(self, text):
+        """
+        Return the indexed amenities mentioned in free text ("a room with a mini bar and wifi").
+        """
+        words = [amenity_key(word) for word in text.split()]
+        candidates = set(words) | {a + b for a, b in zip(words, words[1:])}
+        with self._lock:
+            return sorted(key for key in candidates if key in self._amenity_bits)
+
+    def top_k(self, k=5, budget=None, guests=None, amenities=(), room_type=None, location=None, room_ids=None):
+        """
+        Return up to k (room_id, score) pairs, best first.
+
+        Hard filters: bookable, capacity >= guests, price <= budget, hotel
+        location containing ``location`` and, when given, membership in
+        ``room_ids`` (e.g. the rooms free for the requested dates). The score
+        adds the share of wanted amenities present, a room-type match, the
+        hotel rating and how cheap the room is relative to the budget (or to
+        the most expensive candidate).
+        """
+        with self._lock:
+            keep = self._bookable.copy()
+            if guests:
+                keep &= self._capacity >= guests
+            if budget is not None:
+                keep &= self._price <= budget
+            if location:
+                wanted = location.lower()
+                codes = [code for name, code in self._location_codes.items() if wanted in name]
+                keep &= np.isin(self._location, codes)
+            if room_ids is not None:
+                keep &= np.isin(self._room_id, np.fromiter(room_ids, dtype=np.int64))
+            candidates = np.flatnonzero(keep)
+            if not len(candidates):
+                return []
+
+            price = self._price[candidates]
+            ceiling = budget if budget else price.max()
+            score = WEIGHTS["price"] * (1.0 - price / ceiling) if ceiling > 0 else np.zeros(len(candidates))
+            score += WEIGHTS["rating"] * self._rating[candidates] / 5.0
+
+            bits = [self._amenity_bits[key] for key in map(amenity_key, amenities) if key in self._amenity_bits]
+            if amenities:
+                masks = self._amenities[candidates]
+                matched = np.zeros(len(candidates))
+                for bit in bits:
+                    matched += (masks >> np.uint64(bit)) & np.uint64(1)
+                score += WEIGHTS["amenities"] * matched / len(amenities)
+            if room_type:
+                wanted = room_type.lower()
+                codes = [code for name, code in self._type_codes.items() if wanted in name]
+                score += WEIGHTS["room_type"] * np.isin(self._type[candidates], codes)
+
+            if len(candidates) > k:
+                # Everything tied with the k-th score stays in, so ties break
+                # the same way (cheaper, then lower id) whatever argpartition picks
+                kth = -np.partition(-score, k - 1)[k - 1]
+                best = np.flatnonzero(score >= kth)
+            else:
+                best = np.arange(len(candidates))
+            room_id = self._room_id[candidates[best]]
+            order = np.lexsort((room_id, price[best], -score[best]))[:k]
+            return [(int(room), float(value)) for room, value in zip(room_id[order], score[best][order])]
+
+    def __len__(self):
+        return len(self._room_id)
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+    def _code(self, table, name):
+        return table.setdefault((name or "").lower(), len(table))
+
+    def _encode(self, row):
+        (room_id, hotel_id, room_type, price, max_guests, room_amenities, bookable,
+         hotel_amenities, rating, location) = row
+        mask = 0
+        for key in parse_amenities(room_amenities) | parse_amenities(hotel_amenities):
+            bit = self._amenity_bits.get(key)
+            if bit is None:
+                if len(self._amenity_bits) >= MAX_AMENITIES:
+                    logger.warning("Amenity %r not indexed: more than %d distinct amenities", key, MAX_AMENITIES)
+                    continue
+                bit = self._amenity_bits[key] = len(self._amenity_bits)
+            mask |= 1 << bit
+        return (room_id, hotel_id, self._code(self._type_codes, room_type), price or 0.0, max_guests or 0,
+                mask, bool(bookable), rating or 0.0, self._code(self._location_codes, location))
+
+    def _set_columns(self, encoded):
+        columns = list(zip(*encoded)) or [()] * 9
+        self._room_id = np.array(columns[0], dtype=np.int64)
+        self._hotel_id = np.array(columns[1], dtype=np.int64)
+        self._type = np.array(columns[2], dtype=np.int32)
+        self._price = np.array(columns[3], dtype=np.float64)
+        self._capacity = np.array(columns[4], dtype=np.int32)
+        self._amenities = np.array(columns[5], dtype=np.uint64)
+        self._bookable = np.array(columns[6], dtype=bool)
+        self._rating = np.array(columns[7], dtype=np.float64)
+        self._location = np.array(columns[8], dtype=np.int32)
+        self._rows = {int(room_id): position for position, room_id in enumerate(self._room_id)}
+
+    def _columns(self):
+        return (self._room_id, self._hotel_id, self._type, self._price, self._capacity,
+                self._amenities, self._bookable, self._rating, self._location)
+
+    def _write(self, position, encoded):
+        for column, value in zip(self._columns(), encoded):
+            column[position] = value
+
+    def _append(self, encoded):
+        existing = [column.tolist() for column in self._columns()]
+        self._set_columns(list(zip(*existing)) + encoded)
+
+
+def _room_rows(room_ids=None, hotel_ids=None):
+    query = db.session.query(
+        Room.id, Room.hotel_id, Room.room_type, Room.price_per_night, Room.max_guests, Room.amenities,
+        Room.availability, Hotel.amenities, Hotel.rating, Hotel.location,
+    ).join(Hotel, Hotel.id == Room.hotel_id)
+    if room_ids is not None or hotel_ids is not None:
+        query = query.filter(db.or_(Room.id.in_(list(room_ids or ())), Room.hotel_id.in_(list(hotel_ids or ()))))
+    return query
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    # new/dirty/deleted still describe what this flush wrote
+    changes = session.info.setdefault("room_ranking_changes", (set(), set()))
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Room):
+            changes[0].add(obj.id)
+        elif isinstance(obj, Hotel):
+            changes[1].add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    changes = session.info.pop("room_ranking_changes", None)
+    if changes and (changes[0] or changes[1]):
+        for index in _indexes:
+            index.mark_changed(*changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("room_ranking_changes", None)
+
+
+# Shared index used by suggest_rooms
+room_ranking_index = RoomRankingIndex()
+_indexes.append(room_ranking_index)
@@ -0,0 +1,207 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to become leader, and between leader health checks;
+# the longest a dead leader goes unreplaced
+DEFAULT_RETRY_INTERVAL = 15
+DEFAULT_LOCK_NAME = "hotel-chatbot-scheduler"
+
+
+class PostgresAdvisoryLock:
+    """
+    Leader lock held as a session-level PostgreSQL advisory lock.
+
+    The lock lives as long as the connection that took it, so a leader
+    that crashes or loses its database connection gives it up at once and
+    any process sharing the database can take over.
+    """
+
+    def __init__(self, app, name=DEFAULT_LOCK_NAME):
+        self.app = app
+        self.key = zlib.crc32(name.encode("utf-8"))
+        self._connection = None
+
+    def acquire(self):
+        with self.app.app_context():
+            connection = db.engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def check(self):
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception as e:
+            logger.warning("Scheduler lock connection lost: %s", e)
+            self._discard()
+            return False
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception as e:
+            logger.warning("Could not release the scheduler lock: %s", e)
+        self._discard()
+
+    def _discard(self):
+        connection, self._connection = self._connection, None
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+class FileLock:
+    """
+    Leader lock held as an exclusive flock on a local file; for a single
+    host (development, the Flask reloader, one box running gunicorn).
+    The OS drops the lock when the holding process exits.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        import fcntl
+
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def check(self):
+        return self._file is not None
+
+    def release(self):
+        lock_file, self._file = self._file, None
+        if lock_file is not None:
+            lock_file.close()
+
+
+def leader_lock(app, lock_file=None):
+    """
+    Advisory lock when the app's database is PostgreSQL, otherwise a lock
+    file (``lock_file`` or one in the temp directory).
+    """
+    if make_url(app.config["SQLALCHEMY_DATABASE_URI"]).get_backend_name() == "postgresql":
+        return PostgresAdvisoryLock(app)
+    return FileLock(lock_file or os.path.join(tempfile.gettempdir(), f"{DEFAULT_LOCK_NAME}.lock"))
+
+
+class LeaderScheduler:
+    """
+    APScheduler wrapper that runs its jobs in one process only.
+
+    Every process that starts it keeps the scheduler paused and tries to
+    take ``lock`` (by default picked in ``init_app``) every
+    ``retry_interval`` seconds. The process holding the lock resumes the
+    scheduler, checks the lock on the same interval and pauses again if it
+    is lost; when the leader dies its lock is released
+    and a standby takes over on its next attempt.
+    """
+
+    def __init__(self, lock=None, retry_interval=DEFAULT_RETRY_INTERVAL, scheduler=None):
+        self.lock = lock
+        self.retry_interval = retry_interval
+        self.scheduler = scheduler or BackgroundScheduler()
+        self.is_leader = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._stats = {"elections_won": 0, "leadership_lost": 0, "leader_since": None}
+
+    def init_app(self, app, lock_file=None):
+        """
+        Use the leader lock that fits the app's database, unless one was given.
+        """
+        if self.lock is None:
+            self.lock = leader_lock(app, lock_file)
+
+    def add_job(self, *args, **kwargs):
+        return self.scheduler.add_job(*args, **kwargs)
+
+    def start(self):
+        """
+        Start competing for leadership. Safe to call more than once.
+        """
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self.scheduler.start(paused=True)
+            self._thread = threading.Thread(target=self._run, name="scheduler-leader", daemon=True)
+            self._thread.start()
+
+    def shutdown(self):
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._stop.set()
+            self._thread.join(timeout=self.retry_interval + 5)
+            self._thread = None
+        self.scheduler.shutdown(wait=False)
+        if self.is_leader:
+            self.is_leader = False
+            self.lock.release()
+
+    def stats(self):
+        return dict(self._stats, is_leader=self.is_leader, running=self._thread is not None,
+                    jobs=[job.id for job in self.scheduler.get_jobs()])
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.is_leader and not self.lock.check():
+                    self._step_down()
+                elif not self.is_leader and self.lock.acquire():
+                    self._take_over()
+            except Exception as e:
+                logger.error("Scheduler leader election failed: %s", e)
+            self._stop.wait(self.retry_interval)
+
+    def _take_over(self):
+        self.is_leader = True
+        self._stats["elections_won"] += 1
+        self._stats["leader_since"] = time.time()
+        logger.info("Process %d is now the scheduler leader", os.getpid())
+        self.scheduler.resume()
+
+    def _step_down(self):
+        self.scheduler.pause()
+        self.is_leader = False
+        self._stats["leadership_lost"] += 1
+        self._stats["leader_since"] = None
+        logger.warning("Process %d lost the scheduler lock; jobs paused", os.getpid())
@@ -0,0 +1,221 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+
+from symspellpy import SymSpell
+
+MAGIC = b"SYMIDX01"
+# magic, max_edit_distance, prefix_length, max_length, word_count, slot_count,
+# keys_size, postings_count, words_size
+HEADER = struct.Struct("<8s8I")
+SLOT_FIELDS = 5  # hash, key offset, key length, postings offset, postings length
+
+
+def index_path_for(dictionary_path):
+    return dictionary_path + ".symspell.idx"
+
+
+def _slot_count(keys):
+    # Power of two with the table at most ~65% full
+    size = 1
+    while size * 0.65 < keys:
+        size *= 2
+    return size
+
+
+def build_index(dictionary_path, index_path=None, max_edit_distance=2, prefix_length=7):
+    """
+    Precompute SymSpell's delete-variant index for a frequency dictionary
+    and write it as a flat, memory-mappable file.
+
+    Layout after the header: word counts (uint64), word offsets (uint32),
+    word bytes, hash slots (uint32 x 5, open addressing on crc32), delete
+    key bytes, postings (uint32 word numbers).
+    """
+    index_path = index_path or index_path_for(dictionary_path)
+    sym_spell = SymSpell(max_dictionary_edit_distance=max_edit_distance, prefix_length=prefix_length)
+    if not sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1):
+        raise FileNotFoundError(dictionary_path)
+
+    words = list(sym_spell.words)
+    word_numbers = {word: number for number, word in enumerate(words)}
+    counts = array("Q", (sym_spell.words[word] for word in words))
+    word_offsets = array("I", [0])
+    word_bytes = bytearray()
+    for word in words:
+        word_bytes += word.encode("utf-8")
+        word_offsets.append(len(word_bytes))
+
+    deletes = sym_spell.deletes
+    slot_count = _slot_count(len(deletes))
+    mask = slot_count - 1
+    slots = array("I", bytes(4 * SLOT_FIELDS * slot_count))
+    key_bytes = bytearray()
+    postings = array("I")
+    for key, suggestions in deletes.items():
+        encoded = key.encode("utf-8")
+        slot = zlib.crc32(encoded) & mask
+        while slots[slot * SLOT_FIELDS + 4]:
+            slot = (slot + 1) & mask
+        base = slot * SLOT_FIELDS
+        slots[base] = zlib.crc32(encoded)
+        slots[base + 1] = len(key_bytes)
+        slots[base + 2] = len(encoded)
+        slots[base + 3] = len(postings)
+        slots[base + 4] = len(suggestions)
+        key_bytes += encoded
+        postings.extend(word_numbers[word] for word in suggestions)
+
+    header = HEADER.pack(MAGIC, max_edit_distance, prefix_length, sym_spell._max_length, len(words),
+                         slot_count, len(key_bytes), len(postings), len(word_bytes))
+    # Per-process temporary name: workers may build on first use at once
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for section in (counts, word_offsets, word_bytes, slots, key_bytes, postings):
+            f.write(section.tobytes() if isinstance(section, array) else section)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+class MappedDeletes(Mapping):
+    """
+    Read-only view of SymSpell's ``_deletes`` dict over a memory-mapped index.
+
+    Only the operations SymSpell's lookups use are needed (``in`` and item
+    access). The mapped pages are shared by every process that maps the
+    same file, so pre-forked workers do not each hold a private copy.
+    """
+
+    def __init__(self, buffer, offset, slot_count, keys_size, postings_count, words):
+        view = memoryview(buffer)
+        slots_size = 4 * SLOT_FIELDS * slot_count
+        self._slots = view[offset:offset + slots_size].cast("I")
+        offset += slots_size
+        self._keys = view[offset:offset + keys_size]
+        offset += keys_size
+        self._postings = view[offset:offset + 4 * postings_count].cast("I")
+        self._mask = slot_count - 1
+        self._words = words
+        self._length = None
+
+    def _find(self, key):
+        encoded = key.encode("utf-8")
+        key_hash = zlib.crc32(encoded)
+        slots, keys, mask = self._slots, self._keys, self._mask
+        slot = key_hash & mask
+        while True:
+            base = slot * SLOT_FIELDS
+            length = slots[base + 4]
+            if not length:
+                return None
+            if slots[base] == key_hash and slots[base + 2] == len(encoded):
+                start = slots[base + 1]
+                if keys[start:start + len(encoded)] == encoded:
+                    return slots[base + 3], length
+            slot = (slot + 1) & mask
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self._find(key) is not None
+
+    def __getitem__(self, key):
+        found = self._find(key) if isinstance(key, str) else None
+        if found is None:
+            raise KeyError(key)
+        start, length = found
+        words = self._words
+        return [words[number] for number in self._postings[start:start + length]]
+
+    def __iter__(self):
+        slots, keys = self._slots, self._keys
+        for base in range(0, len(slots), SLOT_FIELDS):
+            if slots[base + 4]:
+                start = slots[base + 1]
+                yield bytes(keys[start:start + slots[base + 2]]).decode("utf-8")
+
+    def __len__(self):
+        if self._length is None:
+            self._length = sum(1 for base in range(4, len(self._slots), SLOT_FIELDS) if self._slots[base])
+        return self._length
+
+
+def _index_size(word_count, slot_count, keys_size, postings_count, words_size):
+    # Bytes the header says the file holds; see build_index for the layout
+    return (HEADER.size + 8 * word_count + 4 * (word_count + 1) + words_size
+            + 4 * SLOT_FIELDS * slot_count + keys_size + 4 * postings_count)
+
+
+def load_index(index_path, max_edit_distance=2, prefix_length=7):
+    """
+    Build a SymSpell instance whose delete index is memory-mapped from index_path.
+    Returns None if the file was built with different settings or is not
+    the size its header says (truncated or corrupt).
+    """
+    with open(index_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    (magic, stored_distance, stored_prefix, max_length, word_count, slot_count,
+     keys_size, postings_count, words_size) = HEADER.unpack_from(buffer, 0)
+    if (magic != MAGIC or stored_distance != max_edit_distance or stored_prefix != prefix_length
+            or len(buffer) != _index_size(word_count, slot_count, keys_size, postings_count, words_size)):
+        buffer.close()
+        return None
+
+    view = memoryview(buffer)
+    offset = HEADER.size
+    counts = view[offset:offset + 8 * word_count].cast("Q")
+    offset += 8 * word_count
+    word_offsets = view[offset:offset + 4 * (word_count + 1)].cast("I")
+    offset += 4 * (word_count + 1)
+    word_bytes = bytes(view[offset:offset + words_size])
+    offset += words_size
+    words = [word_bytes[word_offsets[i]:word_offsets[i + 1]].decode("utf-8") for i in range(word_count)]
+
+    sym_spell = SymSpell(max_dictionary_edit_distance=max_edit_distance, prefix_length=prefix_length)
+    sym_spell._words = dict(zip(words, counts.tolist()))
+    sym_spell._max_length = max_length
+    sym_spell._deletes = MappedDeletes(buffer, offset, slot_count, keys_size, postings_count, words)
+    return sym_spell
+
+
+def load_sym_spell(dictionary_path, max_edit_distance=2, prefix_length=7, build=True):
+    """
+    Return a SymSpell for dictionary_path, memory-mapping the prebuilt index
+    when it is present and up to date. Otherwise the index is built first
+    (``build=True``) or the dictionary is loaded the slow way.
+    """
+    index_path = index_path_for(dictionary_path)
+    fresh = os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(dictionary_path)
+    if not fresh and build:
+        try:
+            build_index(dictionary_path, index_path, max_edit_distance, prefix_length)
+            fresh = True
+        except OSError:
+            fresh = False  # read-only deployment: fall back to the in-memory load
+    if fresh:
+        sym_spell = load_index(index_path, max_edit_distance, prefix_length)
+        if sym_spell is None and build:
+            # Built with other settings, or truncated: rebuild it once
+            try:
+                build_index(dictionary_path, index_path, max_edit_distance, prefix_length)
+                sym_spell = load_index(index_path, max_edit_distance, prefix_length)
+            except OSError:
+                pass
+        if sym_spell is not None:
+            return sym_spell
+
+    sym_spell = SymSpell(max_dictionary_edit_distance=max_edit_distance, prefix_length=prefix_length)
+    sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1)
+    return sym_spell
+
+
+if __name__ == "__main__":
+    # Build step: python spell_index.py [dictionary_path]
+    dictionary = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "frequency_dictionary_en_82_765.txt")
+    print(f"Wrote {build_index(dictionary)}")
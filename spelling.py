@@ -0,0 +1,110 @@
+import threading
+import time
+from functools import lru_cache
+
+from flask import has_app_context
+
+from models import Hotel, Room
+
+# Hotel vocabulary the English frequency dictionary does not know (or would
+# "correct" into something else). Extended at runtime from Hotel/Room rows.
+BASE_LEXICON = {
+    "single", "double", "twin", "queen", "king", "suite", "suites", "deluxe", "penthouse", "studio",
+    "wifi", "ac", "tv", "minibar", "jacuzzi", "spa", "gym", "sauna", "pool", "rooftop",
+    "checkin", "checkout", "concierge", "valet", "shuttle", "breakfast", "balcony",
+}
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_SEGMENT_CACHE_SIZE = 16384
+# Seconds before hotel and room names are re-read from the database
+DEFAULT_LEXICON_MAX_AGE = 600
+
+
+def _words(text):
+    return [word for word in "".join(c if c.isalnum() else " " for c in text.lower()).split() if word]
+
+
+class SpellingCorrector:
+    """
+    Memoized wrapper around SymSpell's lookup_compound.
+
+    Whole messages are cached in a bounded LRU keyed on the cleaned text.
+    On a miss the message is split at protected tokens (domain words from
+    the lexicon and anything containing digits, such as dates, prices and
+    guest counts). Protected tokens pass through untouched and each run of
+    remaining words is corrected through a second LRU, so common fragments
+    like "check availability" are looked up once and reused across messages.
+    """
+
+    def __init__(self, get_sym_spell, cache_size=DEFAULT_CACHE_SIZE,
+                 segment_cache_size=DEFAULT_SEGMENT_CACHE_SIZE, lexicon_max_age=DEFAULT_LEXICON_MAX_AGE):
+        self._get_sym_spell = get_sym_spell
+        self.lexicon = frozenset(BASE_LEXICON)
+        self.lexicon_max_age = lexicon_max_age
+        self._lexicon_loaded_at = None
+        self._lexicon_lock = threading.Lock()
+        self.correct = lru_cache(maxsize=cache_size)(self._correct)
+        self._correct_segment = lru_cache(maxsize=segment_cache_size)(self._lookup)
+
+    def refresh_lexicon(self):
+        """
+        Rebuild the lexicon from BASE_LEXICON plus hotel names, locations,
+        amenities and room types stored in the database.
+        """
+        words = set(BASE_LEXICON)
+        for hotel in Hotel.query.with_entities(Hotel.name, Hotel.location, Hotel.amenities):
+            for field in hotel:
+                words.update(_words(field or ""))
+        for room in Room.query.with_entities(Room.room_type, Room.amenities).distinct():
+            for field in room:
+                words.update(_words(field or ""))
+        with self._lexicon_lock:
+            changed = words != self.lexicon
+            self.lexicon = frozenset(words)
+            self._lexicon_loaded_at = time.monotonic()
+        if changed:
+            # Cached corrections may have touched words that are now protected
+            self.correct.cache_clear()
+            self._correct_segment.cache_clear()
+
+    def _maybe_refresh_lexicon(self):
+        loaded_at = self._lexicon_loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at <= self.lexicon_max_age:
+            return
+        if not has_app_context():
+            return
+        try:
+            self.refresh_lexicon()
+        except Exception:
+            # Keep serving with the previous lexicon; try again later
+            self._lexicon_loaded_at = time.monotonic()
+
+    def __call__(self, text):
+        self._maybe_refresh_lexicon()
+        return self.correct(text)
+
+    def _correct(self, text):
+        lexicon = self.lexicon
+        output, segment = [], []
+        for token in text.split():
+            if token in lexicon or any(c.isdigit() for c in token):
+                if segment:
+                    output.append(self._correct_segment(" ".join(segment)))
+                    segment = []
+                output.append(token)
+            else:
+                segment.append(token)
+        if segment:
+            output.append(self._correct_segment(" ".join(segment)))
+        return " ".join(output)
+
+    def _lookup(self, segment):
+        suggestions = self._get_sym_spell().lookup_compound(segment, max_edit_distance=2)
+        return suggestions[0].term
+
+    def stats(self):
+        whole, segments = self.correct.cache_info(), self._correct_segment.cache_info()
+        return {
+            "hits": whole.hits, "misses": whole.misses, "size": whole.currsize,
+            "segment_hits": segments.hits, "segment_misses": segments.misses, "segment_size": segments.currsize,
+            "lexicon_size": len(self.lexicon),
+        }
@@ -0,0 +1,110 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+DONE = "[DONE]"
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for a text/event-stream body.
+
+    Bytes are fed in whatever pieces the network delivers; complete events
+    are returned as soon as their terminating blank line arrives. Partial
+    lines (including split multi-byte UTF-8 sequences) stay buffered until
+    the rest shows up, and several events in one read are all returned.
+    Only the ``data`` field is kept, since that is all the Llama API sends.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._data = []
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of bytes and return the data of every completed event.
+        """
+        self._buffer += chunk
+        if b"\n" not in chunk:
+            return []
+        lines = self._buffer.split(b"\n")
+        self._buffer = bytearray(lines.pop())
+        events = []
+        data = self._data
+        for line in lines:
+            if line[-1:] == b"\r":
+                line = line[:-1]
+            if line[:6] == b"data: ":
+                # Fast path for the common "data: {...}" line
+                data.append(line[6:].decode("utf-8", errors="replace"))
+            elif not line:
+                if data:
+                    events.append("\n".join(data))
+                    data.clear()
+            else:
+                self._process_line(line, events)
+        return events
+
+    def flush(self):
+        """
+        Dispatch whatever is left once the stream has ended.
+        """
+        events = []
+        if self._buffer:
+            line = bytes(self._buffer).rstrip(b"\r")
+            self._buffer.clear()
+            self._process_line(line, events)
+        self._process_line(b"", events)
+        return events
+
+    def _process_line(self, line, events):
+        if not line:
+            # Blank line: dispatch the pending event
+            if self._data:
+                events.append("\n".join(self._data))
+                self._data.clear()
+            return
+        if line.startswith(b":"):
+            return  # comment / keep-alive
+        field, _, value = line.partition(b":")
+        if field == b"data":
+            if value.startswith(b" "):
+                value = value[1:]
+            self._data.append(value.decode("utf-8", errors="replace"))
+
+
+def iter_sse_data(chunks):
+    """
+    Yield the data payload of each event in a stream of byte chunks,
+    stopping at the ``[DONE]`` sentinel.
+    """
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        for data in decoder.feed(chunk):
+            if data == DONE:
+                return
+            yield data
+    for data in decoder.flush():
+        if data == DONE:
+            return
+        yield data
+
+
+def iter_completion_deltas(chunks):
+    """
+    Yield the content deltas of a streamed /chat/completions response.
+    """
+    for data in iter_sse_data(chunks):
+        try:
+            payload = json.loads(data)
+        except json.JSONDecodeError:
+            logger.debug("Skipping malformed streaming event")
+            continue
+        choices = payload.get("choices")
+        if choices:
+            content = (choices[0].get("delta") or {}).get("content")
+            if content:
+                yield content
@@ -0,0 +1,148 @@
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Fields that carry what guests typed or were told; logged as their size
+# unless LOG_USER_CONTENT=1
+REDACTED_FIELDS = frozenset({
+    "message", "messages", "response", "content", "data", "session", "memory", "summary", "system_message",
+})
+DEFAULT_QUEUE_SIZE = 10000
+
+log_user_content = os.getenv("LOG_USER_CONTENT") == "1"
+
+
+def _redact(value):
+    if isinstance(value, (str, bytes)):
+        return f"<{len(value)} chars>"
+    if isinstance(value, (list, tuple, dict, set)):
+        return f"<{len(value)} items>"
+    return "<redacted>"
+
+
+class Event:
+    """
+    A log message rendered only when a handler formats it: ``event
+    key=value ...`` (or one JSON object with ``json_output``). Fields in
+    REDACTED_FIELDS are replaced by their size.
+    """
+
+    __slots__ = ("name", "fields")
+    json_output = False
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def as_dict(self):
+        fields = {"event": self.name}
+        for key, value in self.fields.items():
+            fields[key] = _redact(value) if key in REDACTED_FIELDS and not log_user_content else value
+        return fields
+
+    def __str__(self):
+        fields = self.as_dict()
+        if self.json_output:
+            return json.dumps(fields, default=str)
+        return " ".join([self.name] + [f"{key}={value!r}" if isinstance(value, str) else f"{key}={value}"
+                                       for key, value in list(fields.items())[1:]])
+
+
+class StructuredLogger:
+    """
+    Logger for named events with keyword fields: ``log.debug("chat.intent", intent=intent)``.
+
+    The level check happens before anything is built, so a disabled call
+    costs one method call; enabled events are formatted by the handler,
+    which with configure_logging() runs on the queue listener thread.
+    ``every`` keeps one call in N for per-chunk events.
+    """
+
+    def __init__(self, name):
+        self.logger = logging.getLogger(name)
+        self._counters = {}
+
+    def is_enabled(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level, event, every=1, exc_info=None, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        if every > 1:
+            counter = self._counters.get(event)
+            if counter is None:
+                counter = self._counters.setdefault(event, itertools.count())
+            if next(counter) % every:
+                return
+        self.logger.log(level, "%s", Event(event, fields), exc_info=exc_info, stacklevel=3)
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+
+def get_logger(name):
+    return StructuredLogger(name)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without formatting them and
+    drops them (counting the loss) rather than block when the queue is full.
+    """
+
+    dropped = 0
+
+    def prepare(self, record):
+        # The queue never leaves the process, so the record can be
+        # formatted later by the listener
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            type(self).dropped += 1
+
+
+def configure_logging(level="INFO", json_output=False, stream=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Route the root logger through a bounded queue to a stream handler on a
+    background thread, so request threads never wait on log I/O. Returns
+    the listener (stopped, and the queue drained, at exit).
+    """
+    Event.json_output = json_output
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers[:] = [NonBlockingQueueHandler(log_queue)]
+    root.setLevel(level)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener):
+    # QueueListener.stop() fails if the listener was already stopped
+    if listener._thread is not None:
+        listener.stop()
+
+
+def stats():
+    return {"dropped": NonBlockingQueueHandler.dropped}
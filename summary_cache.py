@@ -0,0 +1,155 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Entries younger than this are served as-is
+DEFAULT_TTL = 3600
+# Entries older than ttl but younger than this are served while a refresh runs
+DEFAULT_STALE_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class RedisSummaryBackend:
+    """
+    Optional shared backend so every worker sees summaries computed by the others.
+    Requires the redis package.
+    """
+
+    def __init__(self, url, prefix="summary:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, key):
+        return self.prefix + ":".join(str(part) for part in key)
+
+    def get(self, key):
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["stored_at"]
+
+    def set(self, key, value, stored_at, expire):
+        self.client.set(self._key(key), json.dumps({"value": value, "stored_at": stored_at}), ex=int(expire))
+
+
+class SummaryCache:
+    """
+    LRU/TTL cache of "welcome back" summaries keyed by (user_id, conversation_id).
+
+    A new conversation id means a new key, so a summary never has to be
+    invalidated explicitly; the previous one simply ages out of the LRU.
+    Lookups never block on the LLM: a miss or a stale entry schedules a
+    background refresh and the caller gets None or the stale value.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, stale_ttl=DEFAULT_STALE_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 backend=None, refresh_workers=2):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="summary-refresh")
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, size=len(self._entries), in_flight=len(self._in_flight))
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.backend is not None:
+            try:
+                entry = self.backend.get(key)
+            except Exception as e:
+                logger.warning("Summary backend read failed: %s", e)
+                return None
+            if entry is not None:
+                self._store_local(key, *entry)
+            return entry
+        return None
+
+    def _store_local(self, key, value, stored_at):
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key, value):
+        stored_at = time.time()
+        self._store_local(key, value, stored_at)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, stored_at, self.stale_ttl)
+            except Exception as e:
+                logger.warning("Summary backend write failed: %s", e)
+
+    def get(self, key, compute):
+        """
+        Return the cached summary for key, or None on a miss.
+
+        Misses and stale hits schedule ``compute()`` in the background.
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            self._count("misses")
+            self.refresh_async(key, compute)
+            return None
+
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age <= self.ttl:
+            self._count("hits")
+            return value
+        if age <= self.stale_ttl:
+            self._count("stale_hits")
+            self.refresh_async(key, compute)
+            return value
+
+        self._count("misses")
+        self.refresh_async(key, compute)
+        return None
+
+    def refresh_async(self, key, compute):
+        """
+        Compute and store the summary for key in the background,
+        unless a refresh for the same key is already running.
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._in_flight.add(key)
+        self._executor.submit(self._refresh, key, compute)
+
+    def _refresh(self, key, compute):
+        try:
+            self.put(key, compute())
+            self._count("refreshes")
+        except Exception as e:
+            self._count("refresh_errors")
+            logger.warning("Summary refresh failed for %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,35 @@
+"""
+Background worker: runs the periodic jobs (follow-up dispatch) outside the
+web processes.
+
+Web workers leave the jobs to this process unless started with
+SCHEDULER_MODE=embedded. Run one or more of these next to them; they elect
+a leader among themselves, so a standby takes over within
+SCHEDULER_RETRY_INTERVAL seconds if the active one dies.
+
+Usage:
+    python worker.py
+"""
+import logging
+import signal
+import threading
+
+from app import create_app
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    scheduler = create_app().extensions["scheduler"]
+    scheduler.start()
+    logger.info("Worker started with jobs: %s", ", ".join(job.id for job in scheduler.scheduler.get_jobs()))
+    stop.wait()
+    scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()